@@ -163,8 +163,8 @@ class GitHubClient:
         }
     
     def get_trending(self, language: str = "python", 
-                     since: str = "daily") -> List[Dict]:
-        """Get trending repositories"""
+                     since: str = "daily", limit: int = 10) -> List[Dict]:
+        """Get up to `limit` trending repositories"""
         try:
             query = f"language:{language} stars:>1000"
             if since == "daily":
@@ -174,7 +174,7 @@ class GitHubClient:
             response = requests.get(
                 f"{self.base_url}/search/repositories",
                 headers=self.headers,
-                params={"q": query, "sort": "stars", "order": "desc", "per_page": 10},
+                params={"q": query, "sort": "stars", "order": "desc", "per_page": max(1, min(limit, 100))},
                 timeout=30
             )
             response.raise_for_status()
@@ -591,13 +591,13 @@ class ContentFactory:
         return f"{prefix}_{timestamp}"
     
     def discover_topics(self, limit: int = 10) -> List[Topic]:
-        """Discover trending topics"""
+        """Discover up to `limit` trending topics"""
         topics = []
         
-        # GitHub trending
+        # GitHub trending (at most 5, the rest of the budget goes to Tavily)
         logger.info("📊 Fetching GitHub trending...")
-        repos = self.github.get_trending("python", "weekly")
-        for r in repos[:5]:
+        repos = self.github.get_trending("python", "weekly", limit=min(5, limit))
+        for r in repos[:limit]:
             topic = Topic(
                 id=self._gen_id("gh"),
                 title=r["title"],
@@ -611,7 +611,7 @@ class ContentFactory:
             topics.append(topic)
         
         # Tavily search
-        if self.tavily:
+        if self.tavily and len(topics) < limit:
             logger.info("🔍 Searching Tavily...")
             queries = [
                 "AI automation tools 2026",
@@ -619,7 +619,10 @@ class ContentFactory:
                 "productivity system automation",
             ]
             for q in queries[:2]:
-                results = self.tavily.search(q, max_results=3)
+                remaining = limit - len(topics)
+                if remaining <= 0:
+                    break
+                results = self.tavily.search(q, max_results=min(3, remaining))
                 for i, r in enumerate(results):
                     topic = Topic(
                         id=self._gen_id("tv"),
@@ -8,7 +8,7 @@ import os
 import json
 import subprocess
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from pathlib import Path
 import yaml
 
@@ -123,22 +123,33 @@ Format: Layer, Start, End, Style, Name, MarginL, MarginR, MarginV, Effect, Text
         with open(path, 'w', encoding='utf-8') as f:
             f.write(content)
     
-    def merge_short(self, max_chars: int = 50):
-        """合并短字幕"""
+    def merge_short(self, max_chars: int = 50, max_gap: Optional[float] = None):
+        """合并短字幕 (单次顺序扫描)
+        
+        Args:
+            max_chars: 合并后的最大字符数 (含连接空格)
+            max_gap: 允许合并的最大间隔 (秒, None=不限制)
+        """
         if len(self.subtitles) <= 1:
             return
-            
+        
         merged = []
-        current = self.subtitles[0]
+        current = None
         
-        for sub in self.subtitles[1:]:
-            if len(current.text) + len(sub.text) <= max_chars:
+        for sub in self.subtitles:
+            if (
+                current is not None
+                and len(current.text) + 1 + len(sub.text) <= max_chars
+                and (max_gap is None or sub.start_time - current.end_time <= max_gap)
+            ):
                 current.text = f"{current.text} {sub.text}"
                 current.end_time = sub.end_time
             else:
-                merged.append(current)
-                current = sub
-                
+                if current is not None:
+                    merged.append(current)
+                # 复制一份, 避免修改调用方持有的原对象
+                current = replace(sub)
+        
         merged.append(current)
         self.subtitles = merged
     
@@ -365,9 +376,9 @@ class SubtitleEditor:
         """调整时间轴"""
         self.track.adjust_timing(offset, factor)
     
-    def merge_lines(self, max_chars: int = 50):
+    def merge_lines(self, max_chars: int = 50, max_gap: Optional[float] = None):
         """合并短行"""
-        self.track.merge_short(max_chars)
+        self.track.merge_short(max_chars, max_gap)
     
     def split_lines(self, max_chars: int = 42):
         """拆分长行"""
@@ -39,6 +39,12 @@ def main():
         default=None,
         help="合并短行 (最大字符数, 0=禁用)"
     )
+    parser.add_argument(
+        "--merge-gap",
+        type=float,
+        default=None,
+        help="合并时允许的最大间隔 (秒, 默认不限制)"
+    )
     parser.add_argument(
         "--split", "-p",
         type=int,
@@ -72,7 +78,7 @@ def main():
     
     # 合并短行
     if args.merge is not None and args.merge > 0:
-        editor.merge_lines(max_chars=args.merge)
+        editor.merge_lines(max_chars=args.merge, max_gap=args.merge_gap)
         print(f"短行已合并: max_chars={args.merge}")
     
     # 拆分长行
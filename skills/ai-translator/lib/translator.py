@@ -6,18 +6,151 @@ Supports multiple translation services.
 """
 
 import os
+import re
+import sys
+import asyncio
+import importlib.util
 import json
+import hashlib
+import mmap
+import string
+import threading
+import time
+from collections import deque
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import BinaryIO, Callable, Dict, FrozenSet, List, Optional, Any, Iterable, Iterator, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import logging
 
+# Optional provider SDKs, resolved once at import time
+try:
+    from googletrans import Translator as GoogleTranslator
+except ImportError:
+    GoogleTranslator = None
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+except ImportError:
+    requests = None
+
+try:
+    import openai
+except ImportError:
+    openai = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# dataclass(slots=True) needs Python 3.10; on 3.9 the classes keep a __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Simple mapping for common anime terms (used by the offline fallback)
+_SIMPLE_MAPPINGS: Dict[str, str] = {
+    "hello": "你好",
+    "goodbye": "再见",
+    "thank you": "谢谢",
+    "yes": "是",
+    "no": "不是",
+    "I": "我",
+    "you": "你",
+    "we": "我们",
+    "the": "",
+    "a": "",
+}
+
+# One alternation, longest terms first, so "thank you" wins over "you"
+_SIMPLE_RE = re.compile(
+    r"\b(" + "|".join(
+        re.escape(k) for k in sorted(_SIMPLE_MAPPINGS, key=len, reverse=True)
+    ) + r")\b",
+    re.IGNORECASE,
+)
+_SIMPLE_MAP: Dict[str, str] = {k.lower(): v for k, v in _SIMPLE_MAPPINGS.items()}
+
+# Lines made only of these (after dropping tags) carry nothing to translate
+_NON_TEXT_CHARS: FrozenSet[str] = frozenset(string.punctuation + string.digits + string.whitespace + "♪♫-–—…")
+_MARKUP_RE = re.compile(r"<[^>]*>|\[[^\]]*\]")
+_CJK_LANGS = ("zh", "ja", "ko")
+_CJK_RE = re.compile("[\u4e00-\u9fff\u3040-\u30ff\uac00-\ud7af]")  # CJK ideographs, kana, hangul
+_WRITE_BUFFER = 1 << 20
+
+# (index, timing, text_lines) of one SRT cue, as raw UTF-8 bytes
+SrtBlock = Tuple[Optional[bytes], Optional[bytes], List[bytes]]
+
+
+def _text_key(text: str) -> int:
+    """64-bit digest of a translation-memory key (xxh3 if available, else blake2b)"""
+    data = text.encode("utf-8")
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(data)
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+def _simple_replace(match: "re.Match[str]") -> str:
+    return _SIMPLE_MAP[match.group(1).lower()]
+
+
+def _base_lang(lang: str) -> str:
+    return lang.split("-")[0].lower()
+
+
+def _should_translate(text: str, source_lang: str, target_lang: str) -> bool:
+    """Cheap pre-check: skip lines with no source text or already in the target script"""
+    stripped = _MARKUP_RE.sub("", text)
+    if all(c in _NON_TEXT_CHARS for c in stripped):
+        return False
+    # CJK in a line is only "already translated" when the source is a non-CJK
+    # language; ja -> zh, zh -> ko etc. share the script and must go through
+    source = _base_lang(source_lang)
+    if (
+        _base_lang(target_lang) in _CJK_LANGS
+        and source not in _CJK_LANGS and source != "auto"
+        and _CJK_RE.search(stripped)
+    ):
+        return False
+    return True
+
+
+def _split_srt_block(block: List[bytes]) -> SrtBlock:
+    """Split a cue into (index, timing, text_lines)"""
+    index: Optional[bytes] = None
+    timing: Optional[bytes] = None
+    if block and block[0].strip().isdigit():
+        index, block = block[0], block[1:]
+    if block and b"-->" in block[0]:
+        timing, block = block[0], block[1:]
+    return index, timing, block
+
 
-class Provider(Enum):
+def _iter_srt_blocks(lines: Iterable[bytes]) -> Iterator[SrtBlock]:
+    """Yield one SRT cue at a time from raw lines, without reading the file whole"""
+    block: List[bytes] = []
+    for raw in lines:
+        line = raw.rstrip(b"\r\n")
+        if line.strip():
+            block.append(line)
+        elif block:
+            yield _split_srt_block(block)
+            block = []
+    if block:
+        yield _split_srt_block(block)
+
+
+class Provider(str, Enum):
     """Translation providers"""
     GOOGLE = "google"
     DEEPL = "deepl"
@@ -26,7 +159,7 @@ class Provider(Enum):
     CUSTOM = "custom"
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class TranslationConfig:
     """Translation configuration"""
     source_lang: str
@@ -36,7 +169,7 @@ class TranslationConfig:
     formality: str = "default"  # default, formal, informal
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class TranslationResult:
     """Translation result"""
     original: str
@@ -47,6 +180,72 @@ class TranslationResult:
     provider: str = "google"
 
 
+# Requests per second each provider tolerates before answering 429
+_RATE_LIMITS = {
+    Provider.GOOGLE: 5,
+    Provider.DEEPL: 10,
+    Provider.OPENAI: 3,
+}
+_MAX_RETRIES = 3
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_DEEPL_URL = "https://api-free.deepl.com/v2/translate"
+_DEEPL_BATCH_SIZE = 50  # texts per DeepL request
+_DEEPL_CONCURRENCY = 4
+_SRT_BATCH_CUES = 200  # cues buffered per translate_batch call
+
+
+class _RateLimiter:
+    """Sliding-window request limiter with a cap on in-flight requests"""
+    
+    def __init__(self, max_per_second: int, max_concurrent: int = 4):
+        self.max_per_second = max_per_second
+        self._slots = threading.Semaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._sent = deque()
+    
+    def __enter__(self):
+        self._slots.acquire()
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                while self._sent and now - self._sent[0] >= 1.0:
+                    self._sent.popleft()
+                if len(self._sent) < self.max_per_second:
+                    self._sent.append(now)
+                    return self
+                wait = 1.0 - (now - self._sent[0])
+            time.sleep(wait)
+    
+    def __exit__(self, *exc):
+        self._slots.release()
+        return False
+    
+    async def __aenter__(self):
+        # Same limiter as the sync paths; waits in a worker thread, not the event loop
+        acquire = asyncio.ensure_future(asyncio.to_thread(self.__enter__))
+        try:
+            await asyncio.shield(acquire)
+        except asyncio.CancelledError:
+            def release(f):
+                if not f.cancelled() and f.exception() is None:
+                    self.__exit__()
+            acquire.add_done_callback(release)  # the thread still gets a slot
+            raise
+        return self
+    
+    async def __aexit__(self, *exc):
+        return self.__exit__(*exc)
+
+
+def _retry_after(response: Any, attempt: int) -> float:
+    """Seconds to wait before retrying a 429/5xx: honour Retry-After, else back off"""
+    try:
+        return float(response.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return 0.5 * 2 ** attempt
+
+
 class Translator:
     """Main translator class"""
     
@@ -55,34 +254,139 @@ class Translator:
             source_lang="en",
             target_lang="zh",
         )
+        self.session = None
+        self._rate_limiter = _RateLimiter(_RATE_LIMITS.get(self.config.provider, 10))
+        self._google = None
+        # Translation memory: 64-bit key digest -> translated text
+        self._tm: Dict[int, str] = {}
+        self._tm_prefix = f"{self.config.source_lang}|{self.config.target_lang}|{Provider(self.config.provider).value}|"
+        self._openai = None
+        
+        # Resolve the provider backend once instead of per translated line
+        self._backend = {
+            Provider.GOOGLE: self._translate_google,
+            Provider.DEEPL: self._translate_deepl,
+            Provider.OPENAI: self._translate_openai,
+        }.get(self.config.provider, self._translate_simple)
+        
+        # CLI default (en -> zh via googletrans, SRT) gets a specialised pipeline
+        self._fast_path_eligible = (
+            self.config.provider == Provider.GOOGLE
+            and self.config.source_lang == "en"
+            and self.config.target_lang == "zh"
+            and GoogleTranslator is not None
+        )
+    
+    def _get_session(self):
+        """Get or create a keep-alive HTTP session."""
+        if self.session is None:
+            if requests is None:
+                raise ImportError("requests not installed")
+            adapter = HTTPAdapter(
+                pool_connections=16,
+                pool_maxsize=32,
+                # Only failed connections (nothing reached the provider); status
+                # retries live in _post so each attempt passes the rate limiter
+                max_retries=Retry(total=2, read=0, status=0, backoff_factor=0.2),
+            )
+            self.session = requests.Session()
+            self.session.mount("https://", adapter)
+        return self.session
+    
+    def _post(self, url: str, **kwargs):
+        """POST through the shared session, rate limited, retrying on 429/5xx"""
+        session = self._get_session()
+        for attempt in range(_MAX_RETRIES + 1):
+            with self._rate_limiter:
+                response = session.post(url, **kwargs)
+            if response.status_code not in _RETRY_STATUSES or attempt == _MAX_RETRIES:
+                return response
+            delay = _retry_after(response, attempt)
+            logger.warning(f"⚠️  {response.status_code} from provider, retrying in {delay:.1f}s")
+            time.sleep(delay)
+        return response
     
     def translate(self, text: str) -> str:
         """Translate single text"""
-        if not text.strip():
+        if not _should_translate(text, self.config.source_lang, self.config.target_lang):
             return text
         
-        if self.config.provider == Provider.GOOGLE:
-            return self._translate_google(text)
-        elif self.config.provider == Provider.DEEPL:
-            return self._translate_deepl(text)
-        elif self.config.provider == Provider.OPENAI:
-            return self._translate_openai(text)
-        else:
-            return self._translate_simple(text)
+        key = self._tm_key(text)
+        translated = self._tm.get(key)
+        if translated is None:
+            translated = self._tm[key] = self._backend(text)
+        return translated
+    
+    def _tm_key(self, text: str) -> int:
+        return _text_key(self._tm_prefix + text)
+    
+    def translate_batch(self, texts: List[str]) -> List[str]:
+        """Translate many texts, calling the provider once per distinct string"""
+        unique = list(dict.fromkeys(texts))
+        
+        if self.config.provider == Provider.DEEPL and httpx is not None:
+            # Prefill the translation memory with concurrent multi-text requests
+            api_key = self.config.api_key or os.environ.get("DEEPL_API_KEY")
+            pending = [
+                text for text in unique
+                if _should_translate(text, self.config.source_lang, self.config.target_lang)
+                and self._tm_key(text) not in self._tm
+            ]
+            if api_key and pending:
+                try:
+                    results = asyncio.run(self._translate_batch_async(pending, api_key))
+                    for text, result in zip(pending, results):
+                        self._tm[self._tm_key(text)] = result
+                except Exception as e:
+                    logger.error(f"❌ DeepL batch error: {e}")
+        
+        translated = {text: self.translate(text) for text in unique}
+        return [translated[text] for text in texts]
+    
+    async def _translate_batch_async(self, texts: List[str], api_key: str) -> List[str]:
+        """Send DeepL chunks concurrently over one shared (HTTP/2 if available) client"""
+        chunks = [texts[i:i + _DEEPL_BATCH_SIZE] for i in range(0, len(texts), _DEEPL_BATCH_SIZE)]
+        limit = asyncio.Semaphore(_DEEPL_CONCURRENCY)
+        
+        async with httpx.AsyncClient(
+            http2=_HTTP2,
+            limits=httpx.Limits(max_keepalive_connections=16),
+            timeout=30,
+        ) as client:
+            async def send(chunk: List[str]) -> List[str]:
+                async with limit, self._rate_limiter:
+                    response = await client.post(
+                        _DEEPL_URL,
+                        headers={"Authorization": f"DeepL-Auth-Key {api_key}"},
+                        data={
+                            "text": chunk,
+                            "source_lang": self.config.source_lang.upper(),
+                            "target_lang": self.config.target_lang.upper(),
+                        },
+                    )
+                    response.raise_for_status()
+                    return [t["text"] for t in response.json()["translations"]]
+            
+            results = await asyncio.gather(*(send(chunk) for chunk in chunks))
+        
+        return [text for chunk in results for text in chunk]
     
     def _translate_google(self, text: str) -> str:
         """Google Translate (using basic API)"""
-        try:
-            from googletrans import Translator as GoogleTranslator
-            result = GoogleTranslator().translate(
-                text, 
-                src=self.config.source_lang,
-                dest=self.config.target_lang
-            )
-            return result.text
-        except ImportError:
+        if GoogleTranslator is None:
             logger.warning("⚠️  googletrans not installed. Using simple fallback.")
             return self._translate_simple(text)
+        
+        try:
+            if self._google is None:
+                self._google = GoogleTranslator()
+            with self._rate_limiter:
+                result = self._google.translate(
+                    text, 
+                    src=self.config.source_lang,
+                    dest=self.config.target_lang
+                )
+            return result.text
         except Exception as e:
             logger.error(f"❌ Google Translate error: {e}")
             return self._translate_simple(text)
@@ -95,9 +399,8 @@ class Translator:
             return self._translate_simple(text)
         
         try:
-            import requests
-            response = requests.post(
-                "https://api-free.deepl.com/v2/translate",
+            response = self._post(
+                _DEEPL_URL,
                 headers={"Authorization": f"DeepL-Auth-Key {api_key}"},
                 data={
                     "text": text,
@@ -118,16 +421,32 @@ class Translator:
             logger.warning("⚠️  OpenAI API key not set. Using fallback.")
             return self._translate_simple(text)
         
+        if openai is None:
+            logger.warning("⚠️  openai not installed. Using fallback.")
+            return self._translate_simple(text)
+        
+        messages = [
+            {"role": "system", "content": f"Translate from {self.config.source_lang} to {self.config.target_lang}. Keep the same tone and style."},
+            {"role": "user", "content": text}
+        ]
+        
         try:
-            import openai
-            response = openai.ChatCompletion.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": f"Translate from {self.config.source_lang} to {self.config.target_lang}. Keep the same tone and style."},
-                    {"role": "user", "content": text}
-                ],
-                api_key=api_key,
-            )
+            if hasattr(openai, "OpenAI"):
+                # openai>=1.0: one client (and HTTP session) per Translator
+                if self._openai is None:
+                    self._openai = openai.OpenAI(api_key=api_key)
+                with self._rate_limiter:
+                    response = self._openai.chat.completions.create(
+                        model="gpt-3.5-turbo",
+                        messages=messages,
+                    )
+            else:
+                with self._rate_limiter:
+                    response = openai.ChatCompletion.create(
+                        model="gpt-3.5-turbo",
+                        messages=messages,
+                        api_key=api_key,
+                    )
             return response.choices[0].message.content
         except Exception as e:
             logger.error(f"❌ OpenAI error: {e}")
@@ -138,23 +457,7 @@ class Translator:
         # This is a placeholder - in production, use real API
         logger.info(f"📝 Would translate: {text[:50]}...")
         
-        # Simple mapping for common anime terms
-        mappings = {
-            "hello": "你好",
-            "goodbye": "再见",
-            "thank you": "谢谢",
-            "yes": "是",
-            "no": "不是",
-            "I": "我",
-            "you": "你",
-            "we": "我们",
-            "the": "",
-            "a": "",
-        }
-        
-        result = text
-        for en, zh in mappings.items():
-            result = result.replace(en, zh)
+        result = _SIMPLE_RE.sub(_simple_replace, text)
         
         return result if result != text else f"[ZH] {text}"
     
@@ -172,7 +475,9 @@ class Translator:
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
         try:
-            if format == "srt":
+            if format == "srt" and self._fast_path_eligible:
+                return self._fast_srt_en_zh_google(input_file, output_file)
+            elif format == "srt":
                 return self._translate_srt(input_file, output_file)
             elif format == "txt":
                 return self._translate_txt(input_file, output_file)
@@ -184,72 +489,116 @@ class Translator:
             logger.error(f"❌ Translation error: {e}")
             return False
     
-    def _translate_srt(self, input_file: Path, output_file: Path) -> bool:
-        """Translate SRT subtitle file"""
-        content = input_file.read_text()
-        lines = content.split("\n")
-        
-        result_lines = []
-        i = 0
-        while i < len(lines):
-            line = lines[i]
-            
-            # Skip timestamps
-            if "-->" in line:
-                result_lines.append(line)
-                i += 1
-                continue
-            
-            # Skip index
-            if line.isdigit():
-                result_lines.append(line)
-                i += 1
-                continue
-            
-            # Translate dialogue
-            if line.strip():
-                translated = self.translate(line)
-                result_lines.append(translated)
-            else:
-                result_lines.append(line)
-            
-            i += 1
+    def _translate_srt(
+        self,
+        input_file: Path,
+        output_file: Path,
+        batch: Optional[Callable[[List[str]], List[str]]] = None,
+    ) -> bool:
+        """Translate SRT subtitle file (memory-mapped, streamed in cue batches)"""
+        batch = batch or self.translate_batch
+        # Index/timing lines are copied as bytes; only dialogue is decoded.
+        # Raw binary writer with a large buffer: no text codec layer on output.
+        with open(input_file, "rb") as src, \
+                open(output_file, "wb", buffering=_WRITE_BUFFER) as dst:
+            if os.fstat(src.fileno()).st_size == 0:
+                logger.info(f"✅ Translated: {output_file}")
+                return True
+            with mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:3] == b"\xef\xbb\xbf":
+                    mm.seek(3)
+                pending: List[SrtBlock] = []
+                for block in _iter_srt_blocks(iter(mm.readline, b"")):
+                    pending.append(block)
+                    if len(pending) >= _SRT_BATCH_CUES:
+                        self._write_srt_batch(pending, dst, batch)
+                        pending = []
+                if pending:
+                    self._write_srt_batch(pending, dst, batch)
         
-        output_file.write_text("\n".join(result_lines))
         logger.info(f"✅ Translated: {output_file}")
         return True
     
+    def _write_srt_batch(
+        self,
+        blocks: List[SrtBlock],
+        dst: BinaryIO,
+        batch: Callable[[List[str]], List[str]],
+    ) -> None:
+        """Translate the dialogue of several cues in one batch and write them out"""
+        texts = [line.decode("utf-8") for _, _, text_lines in blocks for line in text_lines]
+        translated = iter(batch(texts))
+        out: List[bytes] = []
+        for index, timing, text_lines in blocks:
+            parts: List[bytes] = [p for p in (index, timing) if p is not None]
+            parts.extend(next(translated).encode("utf-8") for _ in text_lines)
+            parts.append(b"\n")
+            out.append(b"\n".join(parts))
+        dst.write(b"".join(out))
+    
+    def _fast_srt_en_zh_google(self, input_file: Path, output_file: Path) -> bool:
+        """SRT pipeline specialised for en -> zh via googletrans"""
+        return self._translate_srt(input_file, output_file, self._batch_en_zh_google)
+    
+    def _batch_en_zh_google(self, texts: List[str]) -> List[str]:
+        """One googletrans list call per cue batch; provider and languages fixed"""
+        tm = self._tm
+        keys = {text: _text_key("en|zh|google|" + text) for text in dict.fromkeys(texts)}
+        pending = [
+            text for text, key in keys.items()
+            if key not in tm and _should_translate(text, "en", "zh")
+        ]
+        if pending:
+            try:
+                if self._google is None:
+                    self._google = GoogleTranslator()
+                with self._rate_limiter:
+                    results = self._google.translate(pending, src="en", dest="zh")
+                for text, result in zip(pending, results):
+                    tm[keys[text]] = result.text
+            except Exception as e:
+                logger.error(f"❌ Google Translate error: {e}")
+                for text in pending:
+                    tm[keys[text]] = self._translate_simple(text)
+        return [tm.get(keys[text], text) for text in texts]
+    
     def _translate_txt(self, input_file: Path, output_file: Path) -> bool:
         """Translate plain text file"""
-        content = input_file.read_text()
-        paragraphs = content.split("\n\n")
+        paragraphs = input_file.read_text(encoding="utf-8").split("\n\n")
         
-        translated = []
-        for para in paragraphs:
-            if para.strip():
-                translated.append(self.translate(para))
-            else:
-                translated.append("")
+        # One batch for all non-empty paragraphs, written back in place
+        nonempty = [i for i, para in enumerate(paragraphs) if para.strip()]
+        translations = self.translate_batch([paragraphs[i] for i in nonempty])
+        for i, translated in zip(nonempty, translations):
+            paragraphs[i] = translated
         
-        output_file.write_text("\n\n".join(translated))
+        output_file.write_text("\n\n".join(paragraphs), encoding="utf-8")
         logger.info(f"✅ Translated: {output_file}")
         return True
     
     def _translate_json(self, input_file: Path, output_file: Path) -> bool:
         """Translate JSON file (for dialogue scripts)"""
-        data = json.loads(input_file.read_text())
+        root = [json.loads(input_file.read_text(encoding="utf-8"))]
+        
+        # Walk iteratively, remembering where each string leaf lives
+        slots = []
+        stack = [(root, 0)]
+        while stack:
+            container, key = stack.pop()
+            value = container[key]
+            if isinstance(value, str):
+                slots.append((container, key))
+            elif isinstance(value, dict):
+                stack.extend((value, k) for k in value)
+            elif isinstance(value, list):
+                stack.extend((value, i) for i in range(len(value)))
         
-        def translate_item(item):
-            if isinstance(item, str):
-                return self.translate(item)
-            elif isinstance(item, dict):
-                return {k: translate_item(v) for k, v in item.items()}
-            elif isinstance(item, list):
-                return [translate_item(i) for i in item]
-            return item
+        # Repeated speaker tags / boilerplate are translated only once
+        leaves = [container[key] for container, key in slots]
+        for (container, key), translated in zip(slots, self.translate_batch(leaves)):
+            container[key] = translated
         
-        translated_data = translate_item(data)
-        output_file.write_text(json.dumps(translated_data, ensure_ascii=False, indent=2))
+        output_file.write_text(json.dumps(root[0], ensure_ascii=False, indent=2), encoding="utf-8")
         logger.info(f"✅ Translated: {output_file}")
         return True
     
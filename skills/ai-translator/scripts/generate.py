@@ -11,7 +11,41 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "lib"))
 from translator import Translator, TranslationConfig, Provider
 
 
-def main():
+def _add_text_parser(subparsers):
+    text_parser = subparsers.add_parser("text", help="Translate single text")
+    text_parser.add_argument("text", help="Text to translate")
+    text_parser.add_argument("--from", dest="source", default="en")
+    text_parser.add_argument("--to", dest="target", default="zh")
+    text_parser.add_argument("--provider", default="google")
+
+
+def _add_file_parser(subparsers):
+    file_parser = subparsers.add_parser("file", help="Translate file")
+    file_parser.add_argument("input", help="Input file")
+    file_parser.add_argument("output", help="Output file")
+    file_parser.add_argument("--from", dest="source", default="en")
+    file_parser.add_argument("--to", dest="target", default="zh")
+    file_parser.add_argument("--format", default="srt")
+
+
+def _add_batch_parser(subparsers):
+    batch_parser = subparsers.add_parser("batch", help="Batch translate")
+    batch_parser.add_argument("input_dir", help="Input directory")
+    batch_parser.add_argument("output_dir", help="Output directory")
+    batch_parser.add_argument("--from", dest="source", default="en")
+    batch_parser.add_argument("--to", dest="target", default="zh")
+    batch_parser.add_argument("--pattern", default="*.srt")
+
+
+SUBCOMMANDS = {
+    "text": _add_text_parser,
+    "file": _add_file_parser,
+    "batch": _add_batch_parser,
+}
+
+
+def build_parser(argv):
+    """Build the CLI parser, adding only the subparser actually invoked"""
     import argparse
     
     parser = argparse.ArgumentParser(
@@ -32,29 +66,19 @@ Examples:
     
     subparsers = parser.add_subparsers(dest="command")
     
-    # Text
-    text_parser = subparsers.add_parser("text", help="Translate single text")
-    text_parser.add_argument("text", help="Text to translate")
-    text_parser.add_argument("--from", dest="source", default="en")
-    text_parser.add_argument("--to", dest="target", default="zh")
-    text_parser.add_argument("--provider", default="google")
-    
-    # File
-    file_parser = subparsers.add_parser("file", help="Translate file")
-    file_parser.add_argument("input", help="Input file")
-    file_parser.add_argument("output", help="Output file")
-    file_parser.add_argument("--from", dest="source", default="en")
-    file_parser.add_argument("--to", dest="target", default="zh")
-    file_parser.add_argument("--format", default="srt")
-    
-    # Batch
-    batch_parser = subparsers.add_parser("batch", help="Batch translate")
-    batch_parser.add_argument("input_dir", help="Input directory")
-    batch_parser.add_argument("output_dir", help="Output directory")
-    batch_parser.add_argument("--from", dest="source", default="en")
-    batch_parser.add_argument("--to", dest="target", default="zh")
-    batch_parser.add_argument("--pattern", default="*.srt")
+    # Unknown command or --help: build everything so usage stays complete
+    command = argv[0] if argv else None
+    if command in SUBCOMMANDS:
+        SUBCOMMANDS[command](subparsers)
+    else:
+        for add_parser in SUBCOMMANDS.values():
+            add_parser(subparsers)
     
+    return parser
+
+
+def main():
+    parser = build_parser(sys.argv[1:])
     args = parser.parse_args()
     
     if not args.command:
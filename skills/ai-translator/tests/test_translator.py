@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Tests for the translator's pre-translation checks (no provider calls)
+
+Run: python -m unittest discover skills/ai-translator/tests
+"""
+
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "lib"))
+
+from translator import TranslationConfig, Translator, _should_translate
+
+
+class TestShouldTranslate(unittest.TestCase):
+    def test_latin_source_skips_lines_already_in_cjk(self):
+        self.assertFalse(_should_translate("你好", "en", "zh"))
+        self.assertTrue(_should_translate("Hello", "en", "zh"))
+
+    def test_cjk_to_cjk_pairs_are_translated(self):
+        self.assertTrue(_should_translate("こんにちは、元気ですか", "ja", "zh"))
+        self.assertTrue(_should_translate("안녕하세요", "ko", "ja"))
+        self.assertTrue(_should_translate("你好", "zh-CN", "ja"))
+
+    def test_lines_without_text_are_skipped(self):
+        self.assertFalse(_should_translate("♪ 123 ...", "ja", "zh"))
+
+
+class TestTranslate(unittest.TestCase):
+    def test_ja_to_zh_reaches_the_provider(self):
+        translator = Translator(TranslationConfig(source_lang="ja", target_lang="zh"))
+        calls = []
+        translator._backend = lambda text: calls.append(text) or "你好，最近怎么样"
+
+        self.assertEqual(translator.translate("こんにちは、元気ですか"), "你好，最近怎么样")
+        self.assertEqual(calls, ["こんにちは、元気ですか"])
+
+
+if __name__ == "__main__":
+    unittest.main()
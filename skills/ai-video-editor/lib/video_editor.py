@@ -5,19 +5,136 @@ Video Editor - Concatenate, trim, and combine video clips
 Simple video editing operations with ffmpeg.
 """
 
+import asyncio
 import os
 import sys
+import shutil
 import subprocess
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Optional, Dict, Any
-from dataclasses import dataclass
+from typing import List, Optional, Dict, Any, Tuple, Callable
+from dataclasses import dataclass, field
 from enum import Enum
+import functools
+import hashlib
 import logging
 import json
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# x264 threading flattens out past ~8 threads; run more jobs instead (see run_batch)
+MAX_JOB_THREADS = 8
+
+# Inputs per concat demuxer run; longer lists are concatenated in two levels
+CONCAT_SHARD_SIZE = 64
+
+# Hardware encoder for each ffmpeg hwaccel method, in order of preference
+HW_ENCODERS = {
+    "cuda": "h264_nvenc",
+    "qsv": "h264_qsv",
+    "vaapi": "h264_vaapi",
+}
+_VAAPI_DEVICE = "/dev/dri/renderD128"
+_VAAPI_UPLOAD = "format=nv12,hwupload"
+
+# Seconds before a trim point scanned for the preceding keyframe
+KEYFRAME_SEARCH_WINDOW = 30.0
+
+# First-pass x264 stats for two-pass encodes, keyed by options + input identity
+# (size, mtime, first MB); each run encodes against its own private copy
+STATS_CACHE_DIR = Path.home() / ".cache" / "video_editor"
+_STATS_HASH_BYTES = 1 << 20
+
+# Large stderr pipe buffer; only the last lines are kept for error messages
+_PIPE_BUFFER = 1 << 20
+_STDERR_TAIL_LINES = 200
+
+# Input probing limits for short single-input operations (trim, screenshots),
+# where ffmpeg's 5 MB / 5 s defaults dominate startup. Not used for ffprobe or
+# multi-input jobs: on TS/MKV/VFR inputs they can miss streams or parameters
+_FAST_PROBE = ["-probesize", "32k", "-analyzeduration", "0"]
+
+# Outputs whose moov atom is moved to the front (-movflags +faststart)
+_FASTSTART_SUFFIXES = {".mp4", ".m4v", ".m4a", ".mov"}
+
+# How the concat demuxer expects a literal single quote inside 'quoted' paths
+_QUOTE_ESCAPE = "'\\''"
+
+# Stream fields that must agree for the concat demuxer to stream-copy safely
+# (container time_base may differ: the copy rescales timestamps)
+_STREAM_SIGNATURE_KEYS = (
+    "codec_type", "codec_name", "profile",
+    "width", "height", "pix_fmt",
+    "sample_rate", "channel_layout",
+)
+
+
+@functools.lru_cache(maxsize=8)
+def _detect_hwaccel(ffmpeg: str) -> Optional[str]:
+    """First hwaccel method ffmpeg supports whose encoder works on this machine
+    
+    ``ffmpeg -hwaccels`` only lists what was compiled in, so each candidate
+    is confirmed with a one-frame test encode. Set VIDEO_EDITOR_HWACCEL to
+    cuda/qsv/vaapi to force a method, or to "none" to disable detection.
+    """
+    override = os.environ.get("VIDEO_EDITOR_HWACCEL")
+    if override is not None:
+        override = override.strip().lower()
+        return override if override in HW_ENCODERS else None
+    
+    try:
+        result = subprocess.run(
+            [ffmpeg, "-hide_banner", "-hwaccels"],
+            capture_output=True, text=True, timeout=10,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    available = set(result.stdout.split())
+    
+    for hwaccel, encoder in HW_ENCODERS.items():
+        if hwaccel not in available:
+            continue
+        cmd = [ffmpeg, "-hide_banner", "-v", "error"]
+        if hwaccel == "vaapi":
+            cmd.extend(["-vaapi_device", _VAAPI_DEVICE])
+        cmd.extend(["-f", "lavfi", "-i", "color=black:s=256x256", "-frames:v", "1"])
+        if hwaccel == "vaapi":
+            cmd.extend(["-vf", _VAAPI_UPLOAD])
+        cmd.extend(["-c:v", encoder, "-f", "null", "-"])
+        try:
+            if subprocess.run(cmd, capture_output=True, timeout=30).returncode == 0:
+                logger.info(f"🚀 Hardware encoding: {encoder}")
+                return hwaccel
+        except (OSError, subprocess.SubprocessError):
+            pass
+    return None
+
+
+@functools.lru_cache(maxsize=1024)
+def _probe_cached(ffprobe: str, path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """Run ffprobe once per (path, mtime, size); the result dict is shared, do not mutate"""
+    cmd = [
+        ffprobe, "-v", "quiet",
+        "-print_format", "json",
+        "-show_format",
+        "-show_streams",
+        path,
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True)
+        return _json_loads(result.stdout)
+    except Exception:
+        return {}
+
 
 class Transition(Enum):
     """Video transitions"""
@@ -27,6 +144,14 @@ class Transition(Enum):
     WIPE = "wipe"
 
 
+# xfade transition name for each Transition
+XFADE_TRANSITIONS = {
+    Transition.FADE: "fade",
+    Transition.DISSOLVE: "dissolve",
+    Transition.WIPE: "wipeleft",
+}
+
+
 class AspectRatio(Enum):
     """Aspect ratios"""
     AR_16_9 = (16, 9)
@@ -47,19 +172,126 @@ class Clip:
     fade_out: float = 0.0   # Fade out duration
 
 
+@dataclass
+class Stage:
+    """One step of a fused VideoEditor.pipeline
+    
+    op / params:
+        resize:    width, height, keep_aspect=True
+        speed:     speed
+        aspect:    aspect_ratio (AspectRatio)
+        subtitles: subtitle_file
+        audio:     audio_file, mix=True
+    """
+    op: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
 class VideoEditor:
     """Main video editor class"""
     
-    def __init__(self, ffmpeg_path: str = "ffmpeg", ffprobe_path: str = "ffprobe"):
+    def __init__(
+        self,
+        ffmpeg_path: str = "ffmpeg",
+        ffprobe_path: str = "ffprobe",
+        threads: Optional[int] = None,
+        two_pass: bool = False,
+        max_bitrate: str = "5M",
+        preset: str = "veryfast",
+        crf: int = 23,
+    ):
         self.ffmpeg = ffmpeg_path
         self.ffprobe = ffprobe_path
+        cpus = os.cpu_count() or 1
+        # ffmpeg -threads per job (None = min(MAX_JOB_THREADS, CPUs), 0 = ffmpeg decides)
+        self.threads = min(MAX_JOB_THREADS, cpus) if threads is None else threads
+        # How many such jobs fit on this machine at once
+        self.concurrency = max(1, cpus // (self.threads or cpus))
+        # Two-pass libx264 at max_bitrate for re-encodes (software encoding only)
+        self.two_pass = two_pass
+        self.max_bitrate = max_bitrate
+        # x264 speed/size trade-off: veryfast encodes ~3x faster than ffmpeg's
+        # default medium for 5-10% larger files; ultrafast also cuts memory use
+        self.preset = preset
+        self.crf = crf
+    
+    @property
+    def hwaccel(self) -> Optional[str]:
+        """Hardware encode method, detected on first use by a re-encoding operation
+        
+        Detection runs test encodes, so stream-copy and probe-only operations
+        never touch it; the result is cached per ffmpeg binary.
+        """
+        return _detect_hwaccel(self.ffmpeg)
+    
+    def _hw_input_args(self) -> List[str]:
+        """Hardware decode options, placed before each -i"""
+        if self.hwaccel == "vaapi":
+            return ["-hwaccel", "vaapi", "-hwaccel_device", _VAAPI_DEVICE]
+        if self.hwaccel:
+            return ["-hwaccel", self.hwaccel]
+        return []
+    
+    def _hw_encode_args(self) -> List[str]:
+        """Video encoder for re-encoding outputs"""
+        return ["-c:v", HW_ENCODERS[self.hwaccel]] if self.hwaccel else []
+    
+    def _encode_opts(self) -> List[str]:
+        """Encoder options for re-encoding outputs (hardware encoder or x264 preset/CRF)"""
+        if self.hwaccel:
+            return self._hw_encode_args()
+        return ["-preset", self.preset, "-crf", str(self.crf)]
+    
+    def _hw_vf(self, vf: str) -> str:
+        """Video filter chain with the upload step VAAPI encoders need"""
+        # Decoded frames stay in system memory (no -hwaccel_output_format) so
+        # the CPU filters used here (scale/pad/xfade/subtitles) keep working
+        return f"{vf},{_VAAPI_UPLOAD}" if self.hwaccel == "vaapi" else vf
     
-    def _run_cmd(self, cmd: List[str]) -> bool:
-        """Run ffmpeg command"""
+    def _prepare_cmd(self, cmd: List[str]) -> List[str]:
+        """Add the per-editor defaults (threads, faststart, VAAPI device)"""
+        if cmd[0] == self.ffmpeg and "-nostats" not in cmd:
+            # Progress lines end in \r, not \n, and would make the captured
+            # stderr tail one unbounded "line"
+            cmd = [cmd[0], "-nostats"] + cmd[1:]
+        if self.threads and cmd[0] == self.ffmpeg and "-threads" not in cmd:
+            # Output options go right before the output path (always last)
+            cmd = cmd[:-1] + ["-threads", str(self.threads), cmd[-1]]
+        if (
+            cmd[0] == self.ffmpeg and "-movflags" not in cmd
+            and Path(cmd[-1]).suffix.lower() in _FASTSTART_SUFFIXES
+        ):
+            cmd = cmd[:-1] + ["-movflags", "+faststart", cmd[-1]]
+        if HW_ENCODERS["vaapi"] in cmd and self.hwaccel == "vaapi":
+            # Global option: the device hwupload hands frames to
+            cmd = [cmd[0], "-vaapi_device", _VAAPI_DEVICE] + cmd[1:]
+        return cmd
+    
+    def _run_cmd(self, cmd: List[str], stdin: Optional[bytes] = None) -> bool:
+        """Run ffmpeg command, optionally feeding stdin (e.g. a concat list on pipe:0)"""
+        cmd = self._prepare_cmd(cmd)
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode != 0:
-                logger.error(f"❌ FFmpeg error: {result.stderr}")
+            proc = subprocess.Popen(
+                cmd,
+                stdin=subprocess.DEVNULL if stdin is None else subprocess.PIPE,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                bufsize=_PIPE_BUFFER,
+            )
+            if stdin is not None:
+                # ffmpeg reads its inputs before writing more than the banner,
+                # so this cannot deadlock against the stderr pipe
+                try:
+                    proc.stdin.write(stdin)
+                except BrokenPipeError:
+                    pass  # ffmpeg exited early; its stderr says why
+                proc.stdin.close()
+            # Drain stderr as it arrives so long encodes never buffer it all
+            tail = deque(proc.stderr, maxlen=_STDERR_TAIL_LINES)
+            proc.stderr.close()
+            if proc.wait() != 0:
+                stderr = b"".join(tail).decode("utf-8", errors="replace")
+                logger.error(f"❌ FFmpeg error: {stderr}")
                 return False
             return True
         except FileNotFoundError:
@@ -69,21 +301,216 @@ class VideoEditor:
             logger.error(f"❌ Error: {e}")
             return False
     
+    async def _run_cmd_async(
+        self,
+        cmd: List[str],
+        stdin: Optional[bytes] = None,
+        progress: Optional[Callable[[Dict[str, str]], None]] = None,
+    ) -> bool:
+        """Async _run_cmd; progress gets each ffmpeg -progress block as a dict"""
+        cmd = self._prepare_cmd(cmd)
+        if progress and cmd[0] == self.ffmpeg:
+            cmd = [cmd[0], "-progress", "pipe:1"] + cmd[1:]
+        
+        try:
+            proc = await asyncio.create_subprocess_exec(
+                *cmd,
+                stdin=asyncio.subprocess.DEVNULL if stdin is None else asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE if progress else asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE,
+                limit=_PIPE_BUFFER,
+            )
+        except FileNotFoundError:
+            logger.error("❌ ffmpeg not found. Install with: apt install ffmpeg")
+            return False
+        
+        async def feed() -> None:
+            if stdin is None:
+                return
+            try:
+                proc.stdin.write(stdin)
+                await proc.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # ffmpeg exited early; its stderr says why
+            proc.stdin.close()
+        
+        async def read_progress() -> None:
+            if not progress:
+                return
+            block: Dict[str, str] = {}
+            async for line in proc.stdout:
+                key, _, value = line.decode("utf-8", errors="replace").strip().partition("=")
+                block[key] = value
+                if key == "progress":  # "continue" / "end" closes each block
+                    progress(block)
+                    block = {}
+        
+        tail: deque = deque(maxlen=_STDERR_TAIL_LINES)
+        
+        async def read_stderr() -> None:
+            async for line in proc.stderr:
+                tail.append(line)
+        
+        try:
+            await asyncio.gather(feed(), read_progress(), read_stderr())
+            if await proc.wait() != 0:
+                stderr = b"".join(tail).decode("utf-8", errors="replace")
+                logger.error(f"❌ FFmpeg error: {stderr}")
+                return False
+            return True
+        except Exception as e:
+            logger.error(f"❌ Error: {e}")
+            return False
+    
+    async def run_cmds_async(
+        self,
+        cmds: List[List[str]],
+        progress: Optional[Callable[[int, Dict[str, str]], None]] = None,
+    ) -> List[bool]:
+        """Run ffmpeg commands concurrently, ``concurrency`` at a time
+        
+        progress(index, block) is called for each -progress update of cmds[index].
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def run(i: int, cmd: List[str]) -> bool:
+            on_progress = (lambda block: progress(i, block)) if progress else None
+            async with semaphore:
+                return await self._run_cmd_async(cmd, progress=on_progress)
+        
+        return list(await asyncio.gather(*(run(i, cmd) for i, cmd in enumerate(cmds))))
+    
+    def _stats_prefix(self, args: List[str]) -> Optional[Path]:
+        """Pass-log prefix under STATS_CACHE_DIR for these encode options and inputs"""
+        h = hashlib.sha256("\0".join(args).encode())
+        try:
+            for i, arg in enumerate(args[:-1]):
+                if arg == "-i":
+                    st = os.stat(args[i + 1])
+                    h.update(f"\0{st.st_size}\0{st.st_mtime_ns}\0".encode())
+                    with open(args[i + 1], "rb") as f:
+                        h.update(f.read(_STATS_HASH_BYTES))
+            STATS_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return None
+        return STATS_CACHE_DIR / h.hexdigest()
+    
+    @staticmethod
+    def _copy_stats(src: Path, dst: Path) -> bool:
+        """Copy libx264 pass logs <src>-0.log[.mbtree] to <dst>, each file replaced atomically
+        
+        The .log is written last, so its presence means the set is complete.
+        """
+        copied = False
+        try:
+            for suffix in ("-0.log.mbtree", "-0.log"):
+                source = Path(f"{src}{suffix}")
+                if not source.exists():
+                    continue
+                fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=f".{dst.name}")
+                os.close(fd)
+                shutil.copyfile(source, tmp)
+                os.replace(tmp, f"{dst}{suffix}")
+                copied = suffix == "-0.log"
+        except OSError as e:
+            logger.warning(f"⚠️  Could not copy first-pass stats: {e}")
+            return False
+        return copied
+    
+    def _run_encode(self, cmd: List[str]) -> bool:
+        """Run a re-encoding ffmpeg command, two-pass when enabled
+        
+        The first pass is skipped when stats for the same inputs and options
+        are already cached.
+        """
+        if not self.two_pass or self.hwaccel:
+            return self._run_cmd(cmd)
+        
+        # Bitrate-targeted, so any CRF from _encode_opts is dropped
+        args = cmd[1:-1]
+        if "-crf" in args:
+            i = args.index("-crf")
+            args = args[:i] + args[i + 2:]
+        args += [
+            "-c:v", "libx264",
+            "-b:v", self.max_bitrate,
+            "-maxrate", self.max_bitrate,
+            "-bufsize", self.max_bitrate,
+        ]
+        cached = self._stats_prefix(args)
+        if cached is None:
+            return self._run_cmd(cmd)
+        
+        # Passes run against a private log so concurrent jobs never share one;
+        # libx264 writes <prefix>-0.log (+ .mbtree) for stream 0
+        with tempfile.TemporaryDirectory(prefix="video_editor_pass_") as tmp:
+            prefix = Path(tmp) / "stats"
+            passlog = ["-passlogfile", str(prefix)]
+            
+            if Path(f"{cached}-0.log").exists() and self._copy_stats(cached, prefix):
+                logger.info("♻️ Reusing first-pass stats")
+            elif self._run_cmd([self.ffmpeg, *args, "-pass", "1", *passlog, "-f", "null", os.devnull]):
+                self._copy_stats(prefix, cached)
+            else:
+                return False
+            
+            return self._run_cmd([self.ffmpeg, *args, "-pass", "2", *passlog, cmd[-1]])
+    
+    def run_batch(
+        self,
+        specs: List[Tuple[str, Dict[str, Any]]],
+        max_workers: Optional[int] = None,
+    ) -> List[bool]:
+        """Run independent jobs in parallel, e.g. [("trim", {...}), ("resize", {...})]
+        
+        Each job runs with ``threads`` ffmpeg threads and ``concurrency``
+        jobs (cpu_count // threads) run at once.
+        """
+        if not specs:
+            return []
+        
+        workers = max_workers or self.concurrency
+        
+        def run(spec: Tuple[str, Dict[str, Any]]) -> bool:
+            method, kwargs = spec
+            return getattr(self, method)(**kwargs)
+        
+        # Threads are enough: each job just waits on its own ffmpeg process
+        with ThreadPoolExecutor(max_workers=min(workers, len(specs))) as pool:
+            results = list(pool.map(run, specs))
+        
+        logger.info(f"✅ Batch: {sum(results)}/{len(results)} jobs succeeded")
+        return results
+    
+    def _probe(self, file_path: Path) -> Dict[str, Any]:
+        """Cached ffprobe of a file, invalidated when its mtime or size changes"""
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            return {}
+        return _probe_cached(self.ffprobe, os.fspath(file_path), st.st_mtime_ns, st.st_size)
+    
     def get_duration(self, file_path: Path) -> float:
         """Get video duration in seconds"""
-        cmd = [
-            self.ffprobe, "-v", "error",
-            "-print_format", "json",
-            "-show_format", "-show_streams",
-            str(file_path),
-        ]
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            data = json.loads(result.stdout)
-            return float(data["format"]["duration"])
+            return float(self._probe(file_path)["format"]["duration"])
         except Exception:
             return 0.0
     
+    def _probe_batch(self, input_files: List[Path]) -> List[Dict[str, Any]]:
+        """Probe several files concurrently (one ffprobe each, run in threads)"""
+        workers = min(len(input_files), os.cpu_count() or 4)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            return list(pool.map(self.get_info, input_files))
+    
+    @staticmethod
+    def _stream_signature(info: Dict[str, Any]) -> Tuple:
+        """Comparable summary of a probe result's streams"""
+        return tuple(
+            tuple(stream.get(key) for key in _STREAM_SIGNATURE_KEYS)
+            for stream in info.get("streams", [])
+        )
+    
     def concat(
         self,
         input_files: List[Path],
@@ -98,26 +525,107 @@ class VideoEditor:
         
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        # Create concat list file
-        list_file = output_file.with_suffix(".txt")
-        with open(list_file, "w") as f:
-            for file in input_files:
-                f.write(f"file '{file.absolute()}'\n")
+        infos = self._probe_batch(input_files)
+        signatures = {self._stream_signature(info) for info in infos}
+        if all(infos) and len(signatures) != 1:
+            logger.info("🔀 Inputs differ in codec/parameters, re-encoding...")
+            return self._concat_reencode(input_files, output_file, infos)
         
-        # Build ffmpeg command
+        if len(input_files) > CONCAT_SHARD_SIZE:
+            return self._concat_sharded(input_files, output_file)
+        
+        # Concat list, piped to ffmpeg on stdin (single quotes escaped for the demuxer)
+        abs_paths = map(os.path.abspath, map(os.fspath, input_files))
+        quoted = (p.replace("'", _QUOTE_ESCAPE) for p in abs_paths)
+        listing = "".join(f"file '{p}'\n" for p in quoted).encode()
+        
+        # Build ffmpeg command: identical streams, so pure stream copy with
+        # regenerated timestamps instead of re-deriving them from the inputs
         cmd = [
             self.ffmpeg, "-y",
+            "-fflags", "+genpts",
+            "-protocol_whitelist", "pipe,file",
             "-f", "concat",
             "-safe", "0",
-            "-i", str(list_file),
+            "-i", "pipe:0",
             "-c", "copy",
+            "-avoid_negative_ts", "make_zero",
+            "-movflags", "+faststart",
             str(output_file),
         ]
         
         logger.info(f"🔀 Concatenating {len(input_files)} files...")
         
+        if self._run_cmd(cmd, stdin=listing):
+            size_mb = output_file.stat().st_size / (1024 * 1024)
+            logger.info(f"✅ Concatenated: {output_file} ({size_mb:.2f} MB)")
+            return True
+        
+        return False
+    
+    def _concat_sharded(self, input_files: List[Path], output_file: Path) -> bool:
+        """Two-level concat: concat shards in parallel, then concat the shards"""
+        groups = [
+            input_files[i:i + CONCAT_SHARD_SIZE]
+            for i in range(0, len(input_files), CONCAT_SHARD_SIZE)
+        ]
+        logger.info(f"🔀 Concatenating {len(input_files)} files in {len(groups)} shards...")
+        
+        with tempfile.TemporaryDirectory(dir=output_file.parent, prefix=".concat-") as tmp:
+            parts = [Path(tmp) / f"part{i:04d}{output_file.suffix}" for i in range(len(groups))]
+            
+            def run(job: Tuple[List[Path], Path]) -> bool:
+                group, part = job
+                if len(group) == 1:
+                    shutil.copyfile(group[0], part)
+                    return True
+                return self.concat(group, part)
+            
+            workers = min(len(groups), os.cpu_count() or 4)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                if not all(pool.map(run, zip(groups, parts))):
+                    return False
+            
+            return self.concat(parts, output_file)
+    
+    def _concat_reencode(
+        self,
+        input_files: List[Path],
+        output_file: Path,
+        infos: List[Dict[str, Any]],
+    ) -> bool:
+        """Concatenate mismatched inputs with the concat filter (re-encodes)"""
+        has_audio = all(
+            any(s.get("codec_type") == "audio" for s in info.get("streams", []))
+            for info in infos
+        )
+        
+        cmd = [self.ffmpeg, "-y"]
+        for file in input_files:
+            cmd.extend(self._hw_input_args())
+            cmd.extend(["-i", str(file)])
+        
+        streams = "".join(
+            f"[{i}:v:0][{i}:a:0]" if has_audio else f"[{i}:v:0]"
+            for i in range(len(input_files))
+        )
+        audio = 1 if has_audio else 0
+        outputs = "[v][a]" if has_audio else "[v]"
+        graph = f"{streams}concat=n={len(input_files)}:v=1:a={audio}{outputs}"
+        video = "[v]"
+        if self.hwaccel == "vaapi":
+            graph += f";[v]{_VAAPI_UPLOAD}[vhw]"
+            video = "[vhw]"
+        cmd.extend([
+            "-filter_complex", graph,
+            "-map", video,
+        ])
+        if has_audio:
+            cmd.extend(["-map", "[a]"])
+        cmd.extend(self._encode_opts())
+        cmd.append(str(output_file))
+        
         if self._run_cmd(cmd):
-            list_file.unlink()  # Clean up
             size_mb = output_file.stat().st_size / (1024 * 1024)
             logger.info(f"✅ Concatenated: {output_file} ({size_mb:.2f} MB)")
             return True
@@ -136,42 +644,58 @@ class VideoEditor:
             logger.error("❌ Need at least 2 clips")
             return False
         
+        if transition == Transition.NONE:
+            # Simple concat without transition
+            return self.concat([Path(c.path) for c in clips], output_file)
+        
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        # Build filter complex for transitions
-        filter_parts = []
-        inputs = []
-        for i, clip in enumerate(clips):
-            inputs.extend(["-i", clip.path])
-        
-        # Simple fade transition
-        if transition == Transition.FADE:
-            # Use xfade filter
-            filter_complex = ""
-            for i in range(len(clips)):
-                if clip.fade_in > 0:
-                    pass  # Would add fade filter here
-            
-            # Simplified: just concat with dissolve
-            cmd = [self.ffmpeg, "-y"]
-            for clip in clips:
-                cmd.extend(["-i", clip.path])
-            
-            # Use xfade
-            num_inputs = len(clips)
-            cmd.extend([
-                "-filter_complex",
-                f"[0:v][1:v]xfade=transition=dissolve:duration={transition_duration}:offset=1[v];[v][2:v]xfade=transition=dissolve:duration={transition_duration}[v2]",
-                "-map", "[v]",
-                "-map", "[a]",
-                str(output_file),
-            ])
+        name = XFADE_TRANSITIONS[transition]
+        cmd = [self.ffmpeg, "-y"]
+        durations = []
+        for clip in clips:
+            if clip.start:
+                cmd.extend(["-ss", str(clip.start)])
+            if clip.duration:
+                cmd.extend(["-t", str(clip.duration)])
+            cmd.extend(self._hw_input_args())
+            cmd.extend(["-i", clip.path])
+            durations.append(clip.duration or self.get_duration(Path(clip.path)) - clip.start)
         
-        else:
-            # Simple concat without transition
-            return self.concat([Path(c.path) for c in clips], output_file)
+        has_audio = all(
+            any(s.get("codec_type") == "audio" for s in self.get_info(Path(c.path)).get("streams", []))
+            for c in clips
+        )
         
-        return self._run_cmd(cmd)
+        # One filter graph for the whole chain: clip i starts its transition at
+        # sum(previous durations) - i * transition_duration
+        filters = []
+        video, audio = "[0:v]", "[0:a]"
+        offset = 0.0
+        for i in range(1, len(clips)):
+            offset += durations[i - 1] - transition_duration
+            filters.append(
+                f"{video}[{i}:v]xfade=transition={name}:"
+                f"duration={transition_duration}:offset={offset:.3f}[v{i}]"
+            )
+            video = f"[v{i}]"
+            if has_audio:
+                filters.append(f"{audio}[{i}:a]acrossfade=d={transition_duration}[a{i}]")
+                audio = f"[a{i}]"
+        
+        if self.hwaccel == "vaapi":
+            filters.append(f"{video}{_VAAPI_UPLOAD}[vhw]")
+            video = "[vhw]"
+        
+        cmd.extend(["-filter_complex", ";".join(filters), "-map", video])
+        if has_audio:
+            cmd.extend(["-map", audio])
+        cmd.extend(self._encode_opts())
+        cmd.append(str(output_file))
+        
+        logger.info(f"🔀 Concatenating {len(clips)} clips with {name} transitions...")
+        
+        return self._run_encode(cmd)
     
     def trim(
         self,
@@ -181,11 +705,21 @@ class VideoEditor:
         end: Optional[float] = None,
         duration: Optional[float] = None,
     ) -> bool:
-        """Trim video clip"""
+        """Trim video clip (stream copy, start snapped to the preceding keyframe)"""
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
+        # A stream copy can only start on a keyframe; snap explicitly so the
+        # output starts where it says instead of on a half-decodable GOP
+        keyframe = self._keyframe_before(input_file, start)
+        if keyframe is not None and keyframe < start:
+            if duration and not end:
+                duration += start - keyframe
+            start = keyframe
+        
         cmd = [
             self.ffmpeg, "-y",
+            *_FAST_PROBE,
+            "-noaccurate_seek",
             "-ss", str(start),
         ]
         
@@ -197,6 +731,7 @@ class VideoEditor:
         cmd.extend([
             "-i", str(input_file),
             "-c", "copy",
+            "-avoid_negative_ts", "make_zero",
             str(output_file),
         ])
         
@@ -209,6 +744,37 @@ class VideoEditor:
         
         return False
     
+    def _keyframe_before(self, input_file: Path, timestamp: float) -> Optional[float]:
+        """Time of the last video keyframe at or before timestamp (None if unknown)"""
+        if timestamp <= 0:
+            return None
+        
+        # Only decode keyframes, and only in a window just before the cut
+        window_start = max(0.0, timestamp - KEYFRAME_SEARCH_WINDOW)
+        cmd = [
+            self.ffprobe, "-v", "quiet",
+            "-select_streams", "v:0",
+            "-skip_frame", "nokey",
+            "-read_intervals", f"{window_start}%{timestamp}",
+            "-show_entries", "frame=best_effort_timestamp_time",
+            "-of", "csv=p=0",
+            str(input_file),
+        ]
+        try:
+            result = subprocess.run(cmd, capture_output=True)
+        except Exception:
+            return None
+        
+        keyframe = None
+        for line in result.stdout.split():
+            try:
+                t = float(line.strip(b","))
+            except ValueError:
+                continue
+            if t <= timestamp and (keyframe is None or t > keyframe):
+                keyframe = t
+        return keyframe
+    
     def change_speed(
         self,
         input_file: Path,
@@ -221,15 +787,17 @@ class VideoEditor:
         # video speed filter
         cmd = [
             self.ffmpeg, "-y",
+            *self._hw_input_args(),
             "-i", str(input_file),
-            "-filter:v", f"setpts={1/speed}*PTS",
+            "-filter:v", self._hw_vf(f"setpts={1/speed}*PTS"),
             "-filter:a", f"atempo={speed}",
+            *self._encode_opts(),
             str(output_file),
         ]
         
         logger.info(f"⏩ Speed: {speed}x")
         
-        return self._run_cmd(cmd)
+        return self._run_encode(cmd)
     
     def add_audio(
         self,
@@ -272,19 +840,150 @@ class VideoEditor:
         output_file: Path,
         format: str = "mp3",
     ) -> bool:
-        """Extract audio from video"""
+        """Extract audio from video (stream copy when it is already in the target codec)"""
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
+        codec = "mp3" if format == "mp3" else "aac"
+        source = next(
+            (s.get("codec_name") for s in self._probe(video_file).get("streams", [])
+             if s.get("codec_type") == "audio"),
+            None,
+        )
+        if source == codec:
+            # Pure demux; the muxer (.aac -> ADTS, .m4a -> MP4) follows output_file
+            acodec = "copy"
+            logger.info(f"🎵 Copying {codec} audio stream")
+        else:
+            acodec = "libmp3lame" if codec == "mp3" else "aac"
+        
         cmd = [
             self.ffmpeg, "-y",
             "-i", str(video_file),
             "-vn",
-            "-acodec", "libmp3lame" if format == "mp3" else "aac",
+            "-acodec", acodec,
             str(output_file),
         ]
         
         return self._run_cmd(cmd)
     
+    @staticmethod
+    def _scale_filter(width: int, height: int, keep_aspect: bool = True) -> str:
+        """scale (and pad) filter for resize"""
+        scale_filter = f"scale={width}:{height}"
+        if keep_aspect:
+            scale_filter += ":force_original_aspect_ratio=decrease"
+            # Add padding to maintain exact size
+            scale_filter += f",pad={width}:{height}:(ow-iw)/2:(oh-ih)/2"
+        return scale_filter
+    
+    def _subtitle_filter(self, subtitle_file: Path) -> str:
+        """ass= filter for subtitle_file, converting SRT to a cached .ass first"""
+        subtitle_file = Path(subtitle_file)
+        if subtitle_file.suffix.lower() != ".srt":
+            return f"subtitles={subtitle_file}"
+        
+        # Cached next to the source as <name>.srt.ass, rebuilt when the SRT is newer
+        ass_file = subtitle_file.with_name(subtitle_file.name + ".ass")
+        try:
+            fresh = ass_file.stat().st_mtime_ns >= subtitle_file.stat().st_mtime_ns
+        except OSError:
+            fresh = False
+        if not fresh and not self._run_cmd(
+            [self.ffmpeg, "-y", "-i", str(subtitle_file), str(ass_file)]
+        ):
+            return f"subtitles={subtitle_file}"
+        return f"ass={ass_file}"
+    
+    def pipeline(
+        self,
+        input_file: Path,
+        output_file: Path,
+        stages: List[Stage],
+    ) -> bool:
+        """Run several edits as one ffmpeg filter graph (no intermediate files)
+        
+        e.g. [Stage("resize", {"width": 1280, "height": 720}),
+              Stage("audio", {"audio_file": Path("bgm.mp3")}),
+              Stage("subtitles", {"subtitle_file": Path("subs.srt")})]
+        """
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        has_audio = any(
+            s.get("codec_type") == "audio"
+            for s in self.get_info(input_file).get("streams", [])
+        )
+        
+        cmd = [self.ffmpeg, "-y", *self._hw_input_args(), "-i", str(input_file)]
+        video_filters = []
+        audio_graph = []
+        audio = "[0:a]" if has_audio else None
+        inputs = 1
+        
+        for i, stage in enumerate(stages):
+            params = stage.params
+            if stage.op == "resize":
+                video_filters.append(self._scale_filter(
+                    params["width"], params["height"], params.get("keep_aspect", True)
+                ))
+            elif stage.op == "speed":
+                speed = params["speed"]
+                video_filters.append(f"setpts={1/speed}*PTS")
+                if audio:
+                    audio_graph.append(f"{audio}atempo={speed}[a{i}]")
+                    audio = f"[a{i}]"
+            elif stage.op == "aspect":
+                w, h = params["aspect_ratio"].value
+                video_filters.append(f"setdar={w}/{h}")
+            elif stage.op == "subtitles":
+                video_filters.append(self._subtitle_filter(params["subtitle_file"]))
+            elif stage.op == "audio":
+                cmd.extend(["-i", str(params["audio_file"])])
+                added = f"[{inputs}:a]"
+                inputs += 1
+                if audio and params.get("mix", True):
+                    audio_graph.append(f"{audio}{added}amix=inputs=2:duration=first[a{i}]")
+                    audio = f"[a{i}]"
+                else:
+                    audio = added
+            else:
+                raise ValueError(f"Unknown pipeline stage: {stage.op}")
+        
+        graph = [f"[0:v]{self._hw_vf(','.join(video_filters) or 'null')}[v]"] + audio_graph
+        cmd.extend(["-filter_complex", ";".join(graph), "-map", "[v]"])
+        if audio:
+            # Unfiltered input streams are mapped as "N:a", filter outputs as "[label]"
+            cmd.extend(["-map", audio if audio.startswith("[a") else audio[1:-1]])
+        cmd.extend(self._encode_opts())
+        cmd.append(str(output_file))
+        
+        logger.info(f"🧩 Pipeline: {' -> '.join(stage.op for stage in stages)}")
+        
+        return self._run_cmd(cmd)
+    
+    def transform(
+        self,
+        input_file: Path,
+        output_file: Path,
+        *,
+        resize: Optional[Tuple[int, int]] = None,
+        aspect: Optional[AspectRatio] = None,
+        subtitles: Optional[Path] = None,
+        keep_aspect: bool = True,
+    ) -> bool:
+        """resize -> change_ar -> add_subtitles in one decode (no intermediate files)"""
+        stages = []
+        if resize:
+            width, height = resize
+            stages.append(Stage("resize", {"width": width, "height": height, "keep_aspect": keep_aspect}))
+        if aspect:
+            stages.append(Stage("aspect", {"aspect_ratio": aspect}))
+        if subtitles:
+            stages.append(Stage("subtitles", {"subtitle_file": subtitles}))
+        if not stages:
+            logger.error("❌ Nothing to transform")
+            return False
+        return self.pipeline(input_file, output_file, stages)
+    
     def resize(
         self,
         input_file: Path,
@@ -296,23 +995,21 @@ class VideoEditor:
         """Resize video"""
         output_file.parent.mkdir(parents=True, exist_ok=True)
         
-        scale_filter = f"scale={width}:{height}"
-        if keep_aspect:
-            scale_filter += ":force_original_aspect_ratio=decrease"
-            # Add padding to maintain exact size
-            scale_filter += f",pad={width}:{height}:(ow-iw)/2:(oh-ih)/2"
+        scale_filter = self._scale_filter(width, height, keep_aspect)
         
         cmd = [
             self.ffmpeg, "-y",
+            *self._hw_input_args(),
             "-i", str(input_file),
-            "-vf", scale_filter,
+            "-vf", self._hw_vf(scale_filter),
             "-c:a", "copy",
+            *self._encode_opts(),
             str(output_file),
         ]
         
         logger.info(f"📐 Resizing: {width}x{height}")
         
-        return self._run_cmd(cmd)
+        return self._run_encode(cmd)
     
     def change_ar(
         self,
@@ -348,9 +1045,11 @@ class VideoEditor:
         
         cmd = [
             self.ffmpeg, "-y",
+            *self._hw_input_args(),
             "-i", str(video_file),
-            "-vf", f"subtitles={subtitle_file}",
+            "-vf", self._hw_vf(self._subtitle_filter(subtitle_file)),
             "-c:a", "copy",
+            *self._encode_opts(),
             str(output_file),
         ]
         
@@ -370,6 +1069,7 @@ class VideoEditor:
         
         cmd = [
             self.ffmpeg, "-y",
+            *_FAST_PROBE,
             "-ss", str(timestamp),
             "-i", str(input_file),
             "-vframes", "1",
@@ -382,21 +1082,90 @@ class VideoEditor:
         
         return self._run_cmd(cmd)
     
-    def get_info(self, input_file: Path) -> Dict[str, Any]:
-        """Get video information"""
-        cmd = [
-            self.ffprobe, "-v", "quiet",
-            "-print_format", "json",
-            "-show_format",
-            "-show_streams",
-            str(input_file),
-        ]
+    @staticmethod
+    def _screenshot_select(times: List[float]) -> str:
+        """select expression keeping the first frame at or after each timestamp"""
+        # prev_t (previous frame time, seconds) is NAN on the first frame
+        return "+".join(
+            f"gte(t\\,{t})*(isnan(prev_t)+lt(prev_t\\,{t}))" for t in times
+        )
+    
+    def take_screenshots(
+        self,
+        input_file: Path,
+        output_dir: Path,
+        timestamps: List[float],
+        width: Optional[int] = None,
+        prefix: str = "shot",
+    ) -> List[Path]:
+        """Take screenshots at several timestamps in one decode pass
+        
+        Returns one image per distinct timestamp, in ascending order; timestamps
+        that fall on the same frame share an image, and timestamps past the
+        last frame are left off the end.
+        """
+        times = sorted(set(max(0.0, float(t)) for t in timestamps))
+        if not times:
+            return []
+        
+        output_dir.mkdir(parents=True, exist_ok=True)
         
+        # Frames are named by their pts in milliseconds so each image can be
+        # matched back to the timestamps it answers
+        vf = f"select='{self._screenshot_select(times)}',settb=1/1000"
+        if width:
+            vf += f",scale={width}:-1"
+        
+        work_dir = Path(tempfile.mkdtemp(prefix=f".{prefix}_", dir=output_dir))
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            return json.loads(result.stdout)
-        except Exception:
-            return {}
+            cmd = [
+                self.ffmpeg, "-y",
+                *_FAST_PROBE,
+                *self._hw_input_args(),
+                "-i", str(input_file),
+                "-vf", vf,
+                "-vsync", "vfr",
+                "-frames:v", str(len(times)),
+                "-frame_pts", "1",
+                str(work_dir / "%d.jpg"),
+            ]
+            
+            if not self._run_cmd(cmd):
+                return []
+            
+            frames = sorted(int(p.stem) for p in work_dir.glob("*.jpg"))
+            return self._collect_screenshots(times, frames, work_dir, output_dir, prefix)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _collect_screenshots(
+        times: List[float],
+        frames: List[int],
+        work_dir: Path,
+        output_dir: Path,
+        prefix: str,
+    ) -> List[Path]:
+        """Move frame images (named <pts ms>.jpg) to <prefix>_NNNN.jpg, one entry per time"""
+        shots: List[Path] = []
+        moved: Dict[int, Path] = {}
+        j = 0
+        for i, t in enumerate(times):
+            # The frame chosen for t is the first one at or after it (1 ms of rounding slack)
+            while j < len(frames) and frames[j] < t * 1000 - 1:
+                j += 1
+            if j == len(frames):
+                break
+            pts = frames[j]
+            if pts not in moved:
+                moved[pts] = output_dir / f"{prefix}_{i:04d}.jpg"
+                os.replace(work_dir / f"{pts}.jpg", moved[pts])
+            shots.append(moved[pts])
+        return shots
+        
+    def get_info(self, input_file: Path) -> Dict[str, Any]:
+        """Get video information"""
+        return self._probe(input_file)
 
 
 if __name__ == "__main__":
@@ -438,6 +1207,13 @@ if __name__ == "__main__":
     resize_parser.add_argument("--width", type=int, required=True)
     resize_parser.add_argument("--height", type=int, required=True)
     
+    # Screenshots
+    shots_parser = subparsers.add_parser("screenshots", help="Take screenshots")
+    shots_parser.add_argument("input", help="Input file")
+    shots_parser.add_argument("output_dir", help="Output directory")
+    shots_parser.add_argument("--at", type=float, nargs="+", required=True, help="Timestamps (s)")
+    shots_parser.add_argument("--width", type=int, help="Output width")
+
     # Info
     info_parser = subparsers.add_parser("info", help="Show video info")
     info_parser.add_argument("input", help="Input file")
@@ -461,6 +1237,10 @@ if __name__ == "__main__":
     elif args.command == "resize":
         editor.resize(Path(args.input), Path(args.output), args.width, args.height)
     
+    elif args.command == "screenshots":
+        shots = editor.take_screenshots(Path(args.input), Path(args.output_dir), args.at, args.width)
+        print(f"✅ {len(shots)} screenshots")
+
     elif args.command == "info":
         info = editor.get_info(Path(args.input))
         if info:
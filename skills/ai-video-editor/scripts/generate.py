@@ -4,8 +4,14 @@ Video Editor CLI - Concatenate, trim, and combine video clips
 """
 
 import sys
+import json
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 sys.path.insert(0, str(Path(__file__).parent.parent / "lib"))
 
 from video_editor import VideoEditor, Transition, AspectRatio
@@ -33,9 +39,21 @@ Examples:
   
   # Resize
   %(prog)s resize video.mp4 small.mp4 --width 720 --height 480
+  
+  # Resize, set aspect and burn subtitles in one pass
+  %(prog)s transform video.mp4 out.mp4 --width 1080 --height 1920 --aspect 9:16 --subtitles subs.srt
         """
     )
     
+    parser.add_argument("--threads", type=int, default=None,
+                        help="ffmpeg threads per job (default: min(8, CPUs); 0 = ffmpeg decides)")
+    parser.add_argument("--two-pass", action="store_true",
+                        help="Two-pass x264 for re-encodes (first pass is cached)")
+    parser.add_argument("--max-bitrate", default="5M", help="Two-pass target bitrate")
+    parser.add_argument("--preset", default="veryfast",
+                        help="x264 preset (ultrafast..veryslow; faster = bigger files)")
+    parser.add_argument("--crf", type=int, default=23, help="x264 quality (lower = better, bigger)")
+    
     subparsers = parser.add_subparsers(dest="command")
     
     # Concat
@@ -77,9 +95,20 @@ Examples:
     sub_parser.add_argument("subtitle", help="Subtitle file (SRT)")
     sub_parser.add_argument("output", help="Output file")
     
+    # Transform (resize + aspect + subtitles, one decode)
+    aspects = {f"{ar.value[0]}:{ar.value[1]}": ar for ar in AspectRatio}
+    transform_parser = subparsers.add_parser("transform", help="Resize/aspect/subtitles in one pass")
+    transform_parser.add_argument("input", help="Input file")
+    transform_parser.add_argument("output", help="Output file")
+    transform_parser.add_argument("--width", type=int)
+    transform_parser.add_argument("--height", type=int)
+    transform_parser.add_argument("--aspect", choices=list(aspects))
+    transform_parser.add_argument("--subtitles", help="Subtitle file (SRT)")
+    
     # Info
     info_parser = subparsers.add_parser("info", help="Show video info")
     info_parser.add_argument("input", help="Input file")
+    info_parser.add_argument("--json", action="store_true", help="Print raw ffprobe JSON")
     
     args = parser.parse_args()
     
@@ -87,7 +116,13 @@ Examples:
         parser.print_help()
         sys.exit(1)
     
-    editor = VideoEditor()
+    editor = VideoEditor(
+        threads=args.threads,
+        two_pass=args.two_pass,
+        max_bitrate=args.max_bitrate,
+        preset=args.preset,
+        crf=args.crf,
+    )
     
     if args.command == "concat":
         editor.concat([Path(f) for f in args.inputs], Path(args.output))
@@ -107,9 +142,24 @@ Examples:
     elif args.command == "subtitle":
         editor.add_subtitles(Path(args.video), Path(args.subtitle), Path(args.output))
     
+    elif args.command == "transform":
+        if (args.width is None) != (args.height is None):
+            parser.error("--width and --height must be given together")
+        editor.transform(
+            Path(args.input), Path(args.output),
+            resize=(args.width, args.height) if args.width else None,
+            aspect=aspects[args.aspect] if args.aspect else None,
+            subtitles=Path(args.subtitles) if args.subtitles else None,
+        )
+    
     elif args.command == "info":
         info = editor.get_info(Path(args.input))
-        if info:
+        if info and args.json:
+            if orjson:
+                sys.stdout.buffer.write(orjson.dumps(info, option=orjson.OPT_INDENT_2) + b"\n")
+            else:
+                print(json.dumps(info, indent=2))
+        elif info:
             print("📹 Video Info:")
             for s in info.get("streams", []):
                 if s.get("codec_type") == "video":
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Tests for VideoEditor helpers that do not need ffmpeg
+
+Run: python -m unittest discover skills/ai-video-editor/tests
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "lib"))
+
+from video_editor import VideoEditor
+
+
+class TestScreenshotSelect(unittest.TestCase):
+    def test_filter_uses_prev_t(self):
+        select = VideoEditor._screenshot_select([1.0, 2.5])
+        self.assertEqual(
+            select,
+            "gte(t\\,1.0)*(isnan(prev_t)+lt(prev_t\\,1.0))"
+            "+gte(t\\,2.5)*(isnan(prev_t)+lt(prev_t\\,2.5))",
+        )
+        self.assertNotIn("prev_pt\\", select)
+
+
+class TestCollectScreenshots(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self._tmp.name)
+        self.work_dir = self.output_dir / "work"
+        self.work_dir.mkdir()
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _frames(self, *pts):
+        for p in pts:
+            (self.work_dir / f"{p}.jpg").write_bytes(str(p).encode())
+        return list(pts)
+
+    def test_one_image_per_timestamp(self):
+        frames = self._frames(0, 1000, 2000)
+        shots = VideoEditor._collect_screenshots(
+            [0.0, 1.0, 2.0], frames, self.work_dir, self.output_dir, "shot"
+        )
+        self.assertEqual([p.name for p in shots], ["shot_0000.jpg", "shot_0001.jpg", "shot_0002.jpg"])
+        self.assertEqual(shots[1].read_bytes(), b"1000")
+
+    def test_timestamps_within_one_frame_share_an_image(self):
+        # 1.00 and 1.02 both resolve to the frame at 1.04 s (25 fps)
+        frames = self._frames(40, 1040, 3000)
+        shots = VideoEditor._collect_screenshots(
+            [0.0, 1.0, 1.02, 2.5], frames, self.work_dir, self.output_dir, "shot"
+        )
+        self.assertEqual(len(shots), 4)
+        self.assertEqual(shots[1], shots[2])
+        self.assertEqual(shots[1].read_bytes(), b"1040")
+        self.assertEqual(shots[3].read_bytes(), b"3000")
+
+    def test_timestamps_past_the_end_are_dropped(self):
+        frames = self._frames(0, 500)
+        shots = VideoEditor._collect_screenshots(
+            [0.0, 0.5, 10.0], frames, self.work_dir, self.output_dir, "shot"
+        )
+        self.assertEqual(len(shots), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
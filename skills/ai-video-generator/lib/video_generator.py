@@ -9,16 +9,103 @@ Unified interface for multiple AI video generation providers:
 """
 
 import os
+import sys
+import copy
 import json
 import asyncio
+import functools
+import hashlib
+import random
+import shutil
+import time
 import aiohttp
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Any, AsyncGenerator
-from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple, Any, AsyncGenerator, Awaitable, Callable
+from dataclasses import dataclass, asdict, replace
 from enum import Enum
 import yaml
 import base64
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
+# dataclass(slots=True) needs Python 3.10; on 3.9 the classes keep a __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+@functools.lru_cache(maxsize=32)
+def _encode_image(path: str, mtime_ns: int, size: int) -> str:
+    """Base64 of an image file, read once per (path, mtime, size)."""
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode("ascii")
+
+
+def _read_image_b64(path: str) -> str:
+    """stat + cached encode; blocking, so callers run it in a worker thread."""
+    st = os.stat(path)
+    return _encode_image(os.fspath(path), st.st_mtime_ns, st.st_size)
+
+
+# libyaml's C loader when available (several times faster than the pure-Python one)
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml_cached(path: str, mtime_ns: int) -> Dict:
+    """Parse a YAML config once per (path, mtime); callers must copy before mutating."""
+    with open(path) as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
+# Status polling: exponential backoff with jitter, separate sequences for
+# in-progress polls and HTTP errors
+_POLL_BASE_DELAY = 2.0
+_POLL_MAX_DELAY = 15.0
+_ERROR_BASE_DELAY = 2.0
+_ERROR_MAX_DELAY = 30.0
+
+# Same-provider retries for transient (429/503/504) errors before falling back
+_MAX_TRANSIENT_RETRIES = 3
+
+# Read size when streaming finished videos to disk
+_DOWNLOAD_CHUNK = 1 << 20
+# MP4s are already compressed; ask for them as-is so nothing is gunzipped in Python
+_DOWNLOAD_HEADERS = {"Accept-Encoding": "identity"}
+
+# Skip a provider for _BREAKER_COOLDOWN seconds after this many failures in a row
+_BREAKER_FAILURES = 5
+_BREAKER_COOLDOWN = 60.0
+
+
+def _backoff(attempt: int, base: float, cap: float) -> float:
+    """Delay for the given attempt: base * 2**attempt, capped, +-30% jitter."""
+    return min(cap, base * 2 ** attempt) * random.uniform(0.7, 1.3)
+
+
+def _retry_after(response: aiohttp.ClientResponse) -> Optional[float]:
+    """Seconds from a numeric Retry-After header, if present."""
+    try:
+        return max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        return None
+
+
+def _write_file(path: str, data: bytes):
+    """Write data to path with raw os calls (no buffered file object)."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
 
 class Provider(Enum):
     """Supported video generation providers."""
@@ -54,12 +141,13 @@ class CameraMotion(Enum):
     SHAKE = "shake"
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class VideoParams:
     """Parameters for video generation."""
     # Common
     prompt: str = ""
     image_path: Optional[str] = None
+    image_b64: Optional[str] = None  # image_path contents, encoded once for providers
     duration: int = 5  # seconds
     style: str = "anime"
     motion_scale: float = 1.0
@@ -77,12 +165,15 @@ class VideoParams:
     # Quality
     quality: str = "high"
     upscale: Optional[float] = None  # e.g., 2.0 for 2x upscale
+    
+    # Output: stream the result to this file instead of holding it in memory
+    output_path: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class GeneratedVideo:
     """Result of video generation."""
-    video_data: bytes
+    video_data: Optional[bytes]  # None when streamed straight to local_path
     format: str  # mp4, webm, etc.
     duration: float  # seconds
     fps: int
@@ -103,7 +194,20 @@ class ProviderNotAvailableError(VideoGeneratorError):
     pass
 
 
-class RateLimitError(VideoGeneratorError):
+class AuthError(VideoGeneratorError):
+    """Raised on 401/403; the key is bad, so no retry or fallback."""
+    pass
+
+
+class TransientError(VideoGeneratorError):
+    """Raised on errors worth retrying on the same provider (429/503/504)."""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitError(TransientError):
     """Raised when rate limit is exceeded."""
     pass
 
@@ -113,6 +217,74 @@ class GenerationTimeoutError(VideoGeneratorError):
     pass
 
 
+def _raise_for_status(provider: str, status: int, body: str, retry_after: Optional[float] = None):
+    """Raise the exception type that tells _generate how to handle an HTTP error."""
+    if status in (401, 403):
+        raise AuthError(f"{provider} rejected the API key ({status}): {body}")
+    if status == 429:
+        raise RateLimitError(f"{provider} rate limit exceeded", retry_after)
+    if status in (503, 504):
+        raise TransientError(f"{provider} unavailable ({status}): {body}", retry_after)
+    raise VideoGeneratorError(f"{provider} error ({status}): {body}")
+
+
+class _CircuitBreaker:
+    """Per-provider breaker: closed -> open after repeated failures -> half-open probe."""
+    
+    def __init__(self, failure_threshold: int = _BREAKER_FAILURES, cooldown: float = _BREAKER_COOLDOWN):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+    
+    def allow(self) -> bool:
+        """Whether a request may go to this provider now."""
+        if self.opened_at is None:
+            return True
+        if self.probing or time.monotonic() - self.opened_at < self.cooldown:
+            return False
+        self.probing = True  # half-open: let exactly one request through
+        return True
+    
+    def release(self):
+        """End a half-open probe without a verdict (e.g. provider disabled)."""
+        self.probing = False
+    
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+    
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+
+class _TokenBucket:
+    """Async token bucket: at most `per_minute` starts per minute, bursts up to `burst`."""
+    
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
 class AnimeVideoGenerator:
     """
     Unified AI video generator for anime/cartoon production.
@@ -127,7 +299,31 @@ class AnimeVideoGenerator:
         """Initialize the video generator."""
         self.config = self._load_config(config_path)
         self.session = None
-        self._active_generations = {}
+        self._active_generations: Dict[str, asyncio.Task] = {}  # params digest -> in-flight task
+        self._breakers: Dict[Provider, _CircuitBreaker] = {}
+        # Client-side enforcement of rate_limits (max_concurrent + videos per minute)
+        self._semaphores: Dict[Provider, asyncio.Semaphore] = {}
+        self._buckets: Dict[Provider, _TokenBucket] = {}
+        for name, limits in self.config.get("rate_limits", {}).items():
+            try:
+                provider = Provider(name)
+            except ValueError:
+                continue
+            self._semaphores[provider] = asyncio.Semaphore(max(1, limits.get("max_concurrent", 1)))
+            vpm = limits.get("vpm", limits.get("requests_per_minute"))
+            if vpm:
+                self._buckets[provider] = _TokenBucket(vpm, burst=limits.get("max_concurrent", 1))
+        self._dispatch: Dict[Provider, Callable[[VideoParams], Awaitable[GeneratedVideo]]] = {
+            Provider.RUNWAY: self._generate_runway,
+            Provider.PIKA: self._generate_pika,
+            Provider.KLING: self._generate_kling,
+            Provider.LUMA: self._generate_luma,
+        }
+        # Bound str.format of each preset's template, built once
+        self._motion_formatters: Dict[str, Callable[..., str]] = {
+            style: preset["motion_template"].format
+            for style, preset in self.config.get("motion_presets", {}).items()
+        }
     
     def _load_config(self, config_path: Optional[str] = None) -> Dict:
         """Load configuration."""
@@ -168,13 +364,24 @@ class AnimeVideoGenerator:
                 "kling": {"vpm": 3, "max_concurrent": 1},
                 "luma": {"vpm": 10, "max_concurrent": 3}
             },
+            "http": {
+                "max_connections": 0,  # 0 = no global cap
+                "limit_per_host": 32,
+                "ttl_dns_cache": 300,
+                "keepalive_timeout": 75
+            },
+            # Seeded generations are cached here by their parameters (None = off)
+            "cache_dir": os.environ.get(
+                "AI_VIDEO_GEN_CACHE",
+                str(Path.home() / ".cache" / "ai-video-generator")
+            ),
             "motion_presets": self._default_motion_presets()
         }
         
         if config_path and Path(config_path).exists():
-            with open(config_path) as f:
-                user_config = yaml.safe_load(f) or {}
-            default_config.update(user_config)
+            mtime_ns = Path(config_path).stat().st_mtime_ns
+            user_config = _load_yaml_cached(str(config_path), mtime_ns)
+            default_config.update(copy.deepcopy(user_config))
         
         return default_config
     
@@ -204,18 +411,30 @@ class AnimeVideoGenerator:
         }
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session."""
+        """Get or create HTTP session (owns its connector, closed with it)."""
         if self.session is None or self.session.closed:
+            http = self.config.get("http", {})
+            connector = aiohttp.TCPConnector(
+                limit=http.get("max_connections", 0),
+                limit_per_host=http.get("limit_per_host", 32),
+                ttl_dns_cache=http.get("ttl_dns_cache", 300),
+                keepalive_timeout=http.get("keepalive_timeout", 75),
+                enable_cleanup_closed=True,
+            )
             timeout = aiohttp.ClientTimeout(total=300)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers={"User-Agent": "ai-video-generator/1.0"},
+                json_serialize=_json_dumps,
+            )
         return self.session
     
     def _format_motion_prompt(self, motion: str, style: str = "anime") -> str:
         """Format motion prompt with style preset."""
-        presets = self.config.get("motion_presets", {})
-        if style in presets:
-            template = presets[style]["motion_template"]
-            return template.format(motion=motion)
+        formatter = self._motion_formatters.get(style)
+        if formatter:
+            return formatter(motion=motion)
         return f"{style} style, {motion}"
     
     async def generate_from_text(
@@ -269,8 +488,11 @@ class AnimeVideoGenerator:
         Returns:
             GeneratedVideo object
         """
+        # File read + base64 of a large image would stall every other generation
+        image_b64 = await asyncio.to_thread(_read_image_b64, image_path)
         params = VideoParams(
             image_path=image_path,
+            image_b64=image_b64,
             motion_prompt=motion_prompt,
             duration=duration,
             style=style,
@@ -279,30 +501,169 @@ class AnimeVideoGenerator:
         )
         return await self._generate(params)
     
+    @staticmethod
+    def _params_digest(params: VideoParams) -> str:
+        """Stable digest of everything that affects the generated video."""
+        fields = asdict(params)
+        fields.pop("output_path")
+        blob = json.dumps(fields, sort_keys=True, default=str).encode()
+        return hashlib.blake2b(blob, digest_size=16).hexdigest()
+    
+    def _cache_key(self, params: VideoParams) -> Optional[str]:
+        """Cache key for params; only seeded requests are reproducible enough to cache."""
+        if params.seed is None or not self.config.get("cache_dir"):
+            return None
+        return self._params_digest(params)
+    
+    def _load_cached(self, key: str, params: VideoParams) -> Optional[GeneratedVideo]:
+        """Cached result for key, copied to params.output_path when set."""
+        base = os.path.join(self.config["cache_dir"], key)
+        try:
+            with open(f"{base}.json", "rb") as f:
+                meta = _json_loads(f.read())
+            if params.output_path:
+                shutil.copyfile(f"{base}.{meta['format']}", params.output_path)
+                video_data = None
+            else:
+                with open(f"{base}.{meta['format']}", "rb") as f:
+                    video_data = f.read()
+        except (OSError, ValueError, KeyError):
+            return None
+        
+        return GeneratedVideo(
+            video_data=video_data,
+            format=meta["format"],
+            duration=meta["duration"],
+            fps=meta["fps"],
+            resolution=tuple(meta["resolution"]),
+            provider=Provider(meta["provider"]),
+            seed=meta["seed"],
+            metadata={**meta["metadata"], "cache_hit": True},
+            local_path=params.output_path
+        )
+    
+    def _store_cached(self, key: str, result: GeneratedVideo):
+        """Save result (video + metadata sidecar) under key."""
+        os.makedirs(self.config["cache_dir"], exist_ok=True)
+        base = os.path.join(self.config["cache_dir"], key)
+        if result.local_path:
+            shutil.copyfile(result.local_path, f"{base}.{result.format}")
+        else:
+            _write_file(f"{base}.{result.format}", result.video_data)
+        meta = {
+            "format": result.format,
+            "duration": result.duration,
+            "fps": result.fps,
+            "resolution": list(result.resolution),
+            "provider": result.provider.value,
+            "seed": result.seed,
+            "metadata": result.metadata,
+        }
+        # Sidecar last: its presence marks a complete entry
+        _write_file(f"{base}.json", _json_dumps(meta).encode())
+    
     async def _generate(self, params: VideoParams) -> GeneratedVideo:
+        """Generation, coalescing identical in-flight requests into one."""
+        digest = self._params_digest(params)
+        task = self._active_generations.get(digest)
+        if task is None:
+            task = asyncio.create_task(self._generate_cached(params))
+            self._active_generations[digest] = task
+            task.add_done_callback(lambda _: self._active_generations.pop(digest, None))
+            # Shielded so one cancelled caller does not cancel the shared task
+            return await asyncio.shield(task)
+        
+        result = await asyncio.shield(task)
+        if result.local_path is None:
+            if params.output_path is None:
+                return result
+            # The owner kept the bytes; write them where this caller asked
+            await asyncio.to_thread(_write_file, params.output_path, result.video_data)
+            return replace(result, video_data=None, local_path=params.output_path)
+        if params.output_path is None:
+            # The owner streamed to its own file; this caller wants the bytes
+            data = result.video_data
+            if data is None:
+                data = await asyncio.to_thread(Path(result.local_path).read_bytes)
+            return replace(result, video_data=data, local_path=None)
+        if result.local_path != params.output_path:
+            # Give this caller a copy at its own path
+            await asyncio.to_thread(shutil.copyfile, result.local_path, params.output_path)
+        return replace(result, local_path=params.output_path)
+    
+    async def _generate_cached(self, params: VideoParams) -> GeneratedVideo:
+        """Generation with the on-disk cache for seeded requests."""
+        key = self._cache_key(params)
+        if key:
+            cached = await asyncio.to_thread(self._load_cached, key, params)
+            if cached:
+                return cached
+        
+        result = await self._generate_uncached(params)
+        
+        if key:
+            try:
+                await asyncio.to_thread(self._store_cached, key, result)
+            except OSError as e:
+                print(f"Failed to cache video: {e}")
+        return result
+    
+    async def _generate_uncached(self, params: VideoParams) -> GeneratedVideo:
         """Internal generation with provider fallback."""
         providers = self._get_provider_order(params.provider)
         
         last_error = None
         for provider in providers:
-            try:
-                if provider == Provider.RUNWAY:
-                    return await self._generate_runway(params)
-                elif provider == Provider.PIKA:
-                    return await self._generate_pika(params)
-                elif provider == Provider.KLING:
-                    return await self._generate_kling(params)
-                elif provider == Provider.LUMA:
-                    return await self._generate_luma(params)
-            except ProviderNotAvailableError as e:
-                last_error = e
-                continue
-            except Exception as e:
-                last_error = e
+            breaker = self._breakers.setdefault(provider, _CircuitBreaker())
+            if not breaker.allow():
+                last_error = ProviderNotAvailableError(f"{provider.value} circuit open")
                 continue
+            
+            for attempt in range(_MAX_TRANSIENT_RETRIES + 1):
+                try:
+                    result = await self._generate_with(provider, params)
+                    breaker.record_success()
+                    return result
+                except AuthError:
+                    breaker.release()
+                    raise
+                except ProviderNotAvailableError as e:
+                    # Disabled/unimplemented, not a health signal
+                    last_error = e
+                    breaker.release()
+                    break
+                except TransientError as e:
+                    # Retry the same provider; fall back once retries run out
+                    last_error = e
+                    if attempt == _MAX_TRANSIENT_RETRIES:
+                        breaker.record_failure()
+                        break
+                    delay = e.retry_after
+                    if delay is None:
+                        delay = _backoff(attempt, _ERROR_BASE_DELAY, _ERROR_MAX_DELAY)
+                    await asyncio.sleep(delay)
+                except Exception as e:
+                    last_error = e
+                    breaker.record_failure()
+                    break
         
         raise VideoGeneratorError(f"All providers failed: {last_error}")
     
+    async def _generate_with(self, provider: Provider, params: VideoParams) -> GeneratedVideo:
+        """Generate with one specific provider."""
+        handler = self._dispatch.get(provider)
+        if handler is None:
+            raise ProviderNotAvailableError(f"Unknown provider: {provider}")
+        
+        semaphore = self._semaphores.get(provider)
+        if semaphore is None:
+            return await handler(params)
+        async with semaphore:
+            bucket = self._buckets.get(provider)
+            if bucket:
+                await bucket.acquire()
+            return await handler(params)
+    
     def _get_provider_order(self, provider: Provider) -> List[Provider]:
         """Get ordered list of providers."""
         if provider != Provider.AUTO:
@@ -341,44 +702,86 @@ class AnimeVideoGenerator:
             headers=headers,
             json=payload
         ) as response:
-            if response.status == 429:
-                raise RateLimitError("Runway rate limit exceeded")
             if response.status != 201:
                 error = await response.text()
-                raise VideoGeneratorError(f"Runway error: {error}")
+                _raise_for_status("Runway", response.status, error, _retry_after(response))
             
-            generation = await response.json()
+            generation = await response.json(loads=_json_loads)
             gen_id = generation["id"]
         
         # Poll for completion
-        result = await self._poll_runway(config, headers, gen_id)
+        result = await self._poll_runway(config, headers, gen_id, output_path=params.output_path)
         
         return result
     
-    async def _poll_runway(self, config: Dict, headers: Dict, gen_id: str, timeout: int = 300) -> GeneratedVideo:
-        """Poll Runway for generation completion."""
+    async def _download(self, url: str, path: Path):
+        """Stream url to path in chunks (via <path>.part, renamed when complete)."""
         session = await self._get_session()
-        start_time = asyncio.get_event_loop().time()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        part = path.with_name(path.name + ".part")
+        try:
+            async with session.get(url, headers=_DOWNLOAD_HEADERS) as r:
+                r.raise_for_status()
+                f = await asyncio.to_thread(open, part, "wb")
+                try:
+                    async for chunk in r.content.iter_chunked(_DOWNLOAD_CHUNK):
+                        await asyncio.to_thread(f.write, chunk)
+                finally:
+                    await asyncio.to_thread(f.close)
+            os.replace(part, path)
+        except BaseException:
+            part.unlink(missing_ok=True)
+            raise
+    
+    async def _poll_runway(
+        self,
+        config: Dict,
+        headers: Dict,
+        gen_id: str,
+        timeout: int = 300,
+        output_path: Optional[str] = None
+    ) -> GeneratedVideo:
+        """Poll Runway for generation completion (streams to output_path if given)."""
+        session = await self._get_session()
+        deadline = time.monotonic() + timeout
+        attempt = error_attempt = 0
+        last_status = None
         
         while True:
-            if asyncio.get_event_loop().time() - start_time > timeout:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
                 raise GenerationTimeoutError("Video generation timed out")
             
             async with session.get(
                 f"{config['api_url']}/generations/{gen_id}",
                 headers=headers
             ) as response:
+                if response.status in (401, 403):
+                    _raise_for_status("Runway", response.status, await response.text())
                 if response.status != 200:
-                    await asyncio.sleep(2)
+                    delay = _retry_after(response)
+                    if delay is None:
+                        delay = _backoff(error_attempt, _ERROR_BASE_DELAY, _ERROR_MAX_DELAY)
+                    error_attempt += 1
+                    await asyncio.sleep(min(delay, remaining))
                     continue
                 
-                generation = await response.json()
+                error_attempt = 0
+                generation = await response.json(loads=_json_loads)
+                
+                # A new phase (e.g. queued -> running) starts polling fast again
+                if generation["status"] != last_status:
+                    last_status = generation["status"]
+                    attempt = 0
                 
                 if generation["status"] == "succeeded":
-                    # Download video
                     video_url = generation["output"]["video_url"]
-                    async with session.get(video_url) as r:
-                        video_data = await r.read()
+                    if output_path:
+                        await self._download(video_url, Path(output_path))
+                        video_data = None
+                    else:
+                        async with session.get(video_url, headers=_DOWNLOAD_HEADERS) as r:
+                            video_data = await r.read()
                     
                     resolution = (generation.get("width", 1280), generation.get("height", 768))
                     
@@ -390,13 +793,23 @@ class AnimeVideoGenerator:
                         resolution=resolution,
                         provider=Provider.RUNWAY,
                         seed=generation.get("seed"),
-                        metadata={"model": "gen3"}
+                        metadata={"model": "gen3"},
+                        local_path=str(output_path) if output_path else None
                     )
                 
                 elif generation["status"] == "failed":
                     raise VideoGeneratorError(f"Runway generation failed: {generation.get('error')}")
+                
+                delay = _retry_after(response)
             
-            await asyncio.sleep(3)
+            if delay is None:
+                eta = generation.get("eta")
+                if isinstance(eta, (int, float)) and eta > 0:
+                    delay = min(eta, _POLL_MAX_DELAY)
+                else:
+                    delay = _backoff(attempt, _POLL_BASE_DELAY, _POLL_MAX_DELAY)
+            attempt += 1
+            await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
     
     async def _generate_pika(self, params: VideoParams) -> GeneratedVideo:
         """Generate video using Pika Labs."""
@@ -458,33 +871,44 @@ class AnimeVideoGenerator:
         output_dir: Optional[str] = None,
         **kwargs
     ) -> List[GeneratedVideo]:
-        """Generate multiple videos from prompts."""
-        results = []
-        output_path = Path(output_dir) if output_dir else Path.cwd() / "videos"
-        output_path.mkdir(parents=True, exist_ok=True)
+        """Generate multiple videos from prompts concurrently.
         
-        for i, prompt in enumerate(prompts):
-            try:
-                result = await self.generate_from_text(
-                    prompt=prompt,
-                    duration=duration,
-                    style=style,
-                    provider=provider,
-                    **kwargs
-                )
-                
-                # Save to disk
-                filename = f"video_{i+1:04d}.{result.format}"
-                local_path = output_path / filename
-                with open(local_path, "wb") as f:
-                    f.write(result.video_data)
-                result.local_path = str(local_path)
-                
-                results.append(result)
-                
-            except Exception as e:
-                print(f"Failed to generate video {i+1}: {e}")
+        Per-provider rate_limits bound how many actually run at once, and
+        duplicate prompts share one generation.
+        """
+        base = os.fspath(output_dir) if output_dir else os.path.join(os.getcwd(), "videos")
+        os.makedirs(base, exist_ok=True)
+        
+        async def generate_one(i: int, prompt: str) -> GeneratedVideo:
+            stem = os.path.join(base, f"video_{i+1:04d}")
+            result = await self.generate_from_text(
+                prompt=prompt,
+                duration=duration,
+                style=style,
+                provider=provider,
+                output_path=f"{stem}.mp4",
+                **kwargs
+            )
+            
+            if result.local_path is None:
+                # Provider returned bytes instead of streaming; save off the event loop
+                # and leave the (possibly coalesced, shared) result untouched
+                path = f"{stem}.{result.format}"
+                await asyncio.to_thread(_write_file, path, result.video_data)
+                return replace(result, local_path=path)
+            return result
+        
+        outcomes = await asyncio.gather(
+            *(generate_one(i, prompt) for i, prompt in enumerate(prompts)),
+            return_exceptions=True
+        )
+        
+        results = []
+        for i, outcome in enumerate(outcomes):
+            if isinstance(outcome, BaseException):
+                print(f"Failed to generate video {i+1}: {outcome}")
                 continue
+            results.append(outcome)
         
         return results
     
@@ -509,6 +933,31 @@ class AnimeVideoGenerator:
         await self.close()
 
 
+# Shared generator for the convenience functions, so repeated calls reuse one
+# connection pool. A session is tied to its event loop, so a new loop gets a new one.
+_default_generator: Optional[AnimeVideoGenerator] = None
+_default_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+async def _get_default() -> AnimeVideoGenerator:
+    """Get or create the shared generator for the running event loop."""
+    global _default_generator, _default_loop
+    loop = asyncio.get_running_loop()
+    if _default_generator is None or _default_loop is not loop:
+        _default_generator = AnimeVideoGenerator()
+        _default_loop = loop
+    return _default_generator
+
+
+async def close_default_generator():
+    """Close the shared generator's HTTP session (call before the loop exits)."""
+    global _default_generator, _default_loop
+    if _default_generator is not None and _default_loop is asyncio.get_running_loop():
+        await _default_generator.close()
+    _default_generator = None
+    _default_loop = None
+
+
 # Convenience function
 async def generate_anime_video(
     prompt: str,
@@ -517,15 +966,15 @@ async def generate_anime_video(
     style: str = "anime",
     **kwargs
 ) -> GeneratedVideo:
-    """Quick video generation function."""
-    async with AnimeVideoGenerator() as generator:
-        return await generator.generate_from_text(
-            prompt=prompt,
-            duration=duration,
-            provider=Provider(provider),
-            style=style,
-            **kwargs
-        )
+    """Quick video generation function (reuses the shared generator)."""
+    generator = await _get_default()
+    return await generator.generate_from_text(
+        prompt=prompt,
+        duration=duration,
+        provider=Provider(provider),
+        style=style,
+        **kwargs
+    )
 
 
 if __name__ == "__main__":
@@ -544,21 +993,24 @@ if __name__ == "__main__":
         print(f"Duration: {duration}s, Provider: {provider}")
         
         try:
+            output_path = Path("output.mp4")
             result = await generate_anime_video(
                 prompt=prompt,
                 duration=duration,
-                provider=provider
+                provider=provider,
+                output_path=str(output_path)
             )
             
             print(f"Generated {result.format} video from {result.provider.value}")
             print(f"Duration: {result.duration}s, Resolution: {result.resolution}")
             
-            output_path = Path("output.mp4")
-            with open(output_path, "wb") as f:
-                f.write(result.video_data)
+            if result.local_path is None:
+                output_path.write_bytes(result.video_data)
             print(f"Saved to {output_path}")
             
         except Exception as e:
             print(f"Error: {e}")
+        finally:
+            await close_default_generator()
     
     asyncio.run(main())
@@ -5,9 +5,16 @@ Anime Video Generator CLI - Main generation script
 
 import os
 import sys
+import asyncio
 import argparse
 from pathlib import Path
-from lib.video_generator import AnimeVideoGenerator, VideoProvider, MotionPreset, CameraMotion
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "lib"))
+
+from video_generator import AnimeVideoGenerator, VideoProvider, VideoGeneratorError
+
+# --motion intensity -> VideoParams.motion_scale
+MOTION_SCALES = {"none": 0.0, "slight": 0.3, "moderate": 0.6, "strong": 1.0, "extreme": 1.3}
 
 
 def main():
@@ -61,9 +68,11 @@ Examples:
         parser.print_help()
         sys.exit(1)
     
-    # Initialize generator
-    generator = AnimeVideoGenerator()
-    
+    return asyncio.run(run(args))
+
+
+async def run(args) -> int:
+    """Run one generation with a single generator (and HTTP session)."""
     # Parse provider
     provider_map = {
         "auto": VideoProvider.AUTO,
@@ -74,39 +83,46 @@ Examples:
     }
     provider = provider_map.get(args.provider.lower(), VideoProvider.AUTO)
     
-    if args.mode == "text2video":
-        result = generator.text_to_video(
-            prompt=args.prompt,
-            style=args.style,
-            duration=args.duration,
-            fps=args.fps,
-            aspect_ratio=args.aspect,
-            provider=provider,
-            output_path=args.output
-        )
+    output = Path(args.output or "output.mp4")
+    
+    async with AnimeVideoGenerator() as generator:
+        try:
+            if args.mode == "text2video":
+                result = await generator.generate_from_text(
+                    prompt=args.prompt,
+                    style=args.style,
+                    duration=int(args.duration),
+                    fps=args.fps,
+                    aspect_ratio=args.aspect,
+                    provider=provider,
+                    output_path=str(output)
+                )
+            
+            else:
+                if args.loop:
+                    print("⚠️  --loop is not supported by the current providers, ignoring")
+                result = await generator.generate_from_image(
+                    image_path=args.image,
+                    duration=int(args.duration),
+                    motion_scale=MOTION_SCALES[args.motion],
+                    camera_movement=args.camera.replace("-", "_"),
+                    fps=args.fps,
+                    provider=provider,
+                    output_path=str(output)
+                )
+        except VideoGeneratorError as e:
+            print(f"❌ Failed: {e}")
+            return 1
     
-    elif args.mode == "image2video":
-        result = generator.image_to_video(
-            image=args.image,
-            motion=args.motion,
-            camera_motion=args.camera,
-            duration=args.duration,
-            fps=args.fps,
-            loop=args.loop,
-            provider=provider,
-            output_path=args.output
-        )
+    if result.local_path is None:
+        output.write_bytes(result.video_data)
     
     # Output results
-    if result.success:
-        print(f"✅ Success! Video saved to: {result.video_path}")
-        print(f"   Provider: {result.provider}")
-        print(f"   Duration: {result.duration}s @ {result.fps}fps")
-        print(f"   Resolution: {result.resolution[0]}x{result.resolution[1]}")
-        return 0
-    else:
-        print(f"❌ Failed: {result.error}")
-        return 1
+    print(f"✅ Success! Video saved to: {output}")
+    print(f"   Provider: {result.provider.value}")
+    print(f"   Duration: {result.duration}s @ {result.fps}fps")
+    print(f"   Resolution: {result.resolution[0]}x{result.resolution[1]}")
+    return 0
 
 
 if __name__ == "__main__":
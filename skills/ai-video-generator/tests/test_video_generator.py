@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests for AnimeVideoGenerator request coalescing (no provider calls)
+
+Run: python -m unittest discover skills/ai-video-generator/tests
+"""
+
+import asyncio
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "lib"))
+
+from video_generator import AnimeVideoGenerator, GeneratedVideo, Provider, VideoParams
+
+VIDEO = b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 64
+
+
+class TestCoalescing(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = Path(self._tmp.name)
+        self.generator = AnimeVideoGenerator()
+        self.calls = 0
+
+        async def fake_generate(params: VideoParams) -> GeneratedVideo:
+            # Like a provider download: stream to output_path when given, else keep bytes
+            self.calls += 1
+            await asyncio.sleep(0.01)
+            data = VIDEO
+            if params.output_path:
+                Path(params.output_path).write_bytes(VIDEO)
+                data = None
+            return GeneratedVideo(
+                video_data=data, format="mp4", duration=5.0, fps=24,
+                resolution=(1280, 720), provider=Provider.RUNWAY, seed=1,
+                metadata={}, local_path=params.output_path,
+            )
+
+        self.generator._generate_cached = fake_generate
+
+    async def asyncTearDown(self):
+        await self.generator.close()
+        self._tmp.cleanup()
+
+    async def test_waiter_without_output_path_gets_bytes(self):
+        owner = VideoParams(prompt="sakura", seed=1, output_path=str(self.tmp / "owner.mp4"))
+        waiter = VideoParams(prompt="sakura", seed=1)
+
+        first, second = await asyncio.gather(
+            self.generator._generate(owner), self.generator._generate(waiter)
+        )
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(first.local_path, owner.output_path)
+        self.assertIsNone(second.local_path)
+        self.assertEqual(second.video_data, VIDEO)
+
+    async def test_waiter_with_other_output_path_gets_a_copy(self):
+        owner = VideoParams(prompt="sakura", seed=1, output_path=str(self.tmp / "owner.mp4"))
+        waiter = VideoParams(prompt="sakura", seed=1, output_path=str(self.tmp / "waiter.mp4"))
+
+        _, second = await asyncio.gather(
+            self.generator._generate(owner), self.generator._generate(waiter)
+        )
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second.local_path, waiter.output_path)
+        self.assertEqual(Path(waiter.output_path).read_bytes(), VIDEO)
+
+    async def test_waiter_with_output_path_joining_in_memory_owner(self):
+        owner = VideoParams(prompt="sakura", seed=1)
+        waiter = VideoParams(prompt="sakura", seed=1, output_path=str(self.tmp / "waiter.mp4"))
+
+        _, second = await asyncio.gather(
+            self.generator._generate(owner), self.generator._generate(waiter)
+        )
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(second.local_path, waiter.output_path)
+        self.assertIsNone(second.video_data)
+        self.assertEqual(Path(waiter.output_path).read_bytes(), VIDEO)
+
+
+if __name__ == "__main__":
+    unittest.main()
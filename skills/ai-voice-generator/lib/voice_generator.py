@@ -11,28 +11,141 @@ Unified interface for multiple AI TTS/voice generation providers:
 
 import os
 import io
-import base64
+import sys
+import re
+import copy
+import json
+import time
+import atexit
+import bisect
 import asyncio
+import random
+import hashlib
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 import aiohttp
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple, Any, AsyncGenerator
-from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Tuple, Any, AsyncGenerator, Awaitable, Callable, Union
+from dataclasses import dataclass, field, replace
 from enum import Enum
-import yaml
+from xml.sax.saxutils import escape
 import wave
-import struct
 
-import numpy as np
-
-# Optional dependencies - imported lazily
 try:
-    from pydub import AudioSegment
-    from pydub.effects import normalize
-    PYDUB_AVAILABLE = True
+    import orjson
+    _json_loads = orjson.loads
 except ImportError:
-    PYDUB_AVAILABLE = False
-    AudioSegment = None
-    normalize = None
+    _json_loads = json.loads
+
+# dataclass(slots=True) needs Python 3.10; on 3.9 the classes keep a __dict__
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config_file(path: str, mtime_ns: int) -> Dict:
+    """Parse a JSON or YAML config once per (path, mtime); callers must copy before mutating."""
+    with open(path, "rb") as f:
+        data = f.read()
+    if path.endswith(".json"):
+        return _json_loads(data) or {}
+    
+    import yaml  # only needed without a providers.json
+    # libyaml's C loader when available (several times faster than the pure-Python one)
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(data, Loader=loader) or {}
+
+
+# Cached TTS outputs older than this are regenerated
+CACHE_TTL = 24 * 3600
+
+# Retries of 429/5xx/connection errors on the same provider before falling back
+_RETRY_MAX_ATTEMPTS = int(os.environ.get("AI_RETRY_MAX_ATTEMPTS", 5))
+_RETRY_BASE_DELAY = 0.25
+_RETRY_MAX_DELAY = 30.0
+
+# Read size when streaming audio response bodies
+_READ_CHUNK = 1 << 16
+
+# Audio files are written off the event loop by this small dedicated pool
+_WRITE_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="voice-write")
+
+# AUTO fallback order is re-sorted by observed health every this many calls
+_REORDER_EVERY = 16
+# Weight of the newest sample in a provider's latency moving average
+_LATENCY_EMA_ALPHA = 0.2
+
+# Enough of a WAV to cover its fmt/LIST chunks up to the data chunk header
+_WAV_HEAD_BYTES = 1 << 16
+
+# MPEG audio header tables, indexed by the header's version/layer/rate bits
+_MP3_BITRATES = {  # kbps by (MPEG-1?, layer)
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def _wav_metadata(data: bytes) -> Tuple[float, int, int]:
+    """(duration, sample_rate, channels) of a WAV from its header (no decoding)."""
+    # wave stops at the data chunk header, so only the head needs copying into BytesIO
+    with wave.open(io.BytesIO(memoryview(data)[:_WAV_HEAD_BYTES]), "rb") as wf:
+        sample_rate, channels = wf.getframerate(), wf.getnchannels()
+        # Streamed WAVs may carry a placeholder length; bound it by the bytes received
+        frames = min(wf.getnframes(), len(data) // (wf.getsampwidth() * channels))
+    return frames / sample_rate, sample_rate, channels
+
+
+def _mp3_duration(data: bytes) -> float:
+    """Duration of an MP3 in seconds, from its frame headers (no decoding)."""
+    pos = 0
+    if data[:3] == b"ID3" and len(data) >= 10:
+        # ID3v2 size is syncsafe: 7 bits per byte, excluding the 10-byte header
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        pos = 10 + size + (10 if data[5] & 0x10 else 0)
+    
+    duration = 0.0
+    end = len(data) - 4
+    while pos <= end:
+        b1, b2 = data[pos + 1], data[pos + 2]
+        version = (b1 >> 3) & 3
+        layer = 4 - ((b1 >> 1) & 3)
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 3
+        if (data[pos] != 0xFF or b1 & 0xE0 != 0xE0 or version == 1 or layer == 4
+                or bitrate_index in (0, 15) or rate_index == 3):
+            # Not a frame header (junk, trailing ID3v1 tag, free format): resync
+            pos += 1
+            continue
+        
+        mpeg1 = version == 3
+        bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+        padding = (b2 >> 1) & 1
+        if layer == 1:
+            samples_per_frame = 384
+            frame_len = (12 * bitrate // sample_rate + padding) * 4
+        else:
+            samples_per_frame = 1152 if mpeg1 or layer == 2 else 576
+            frame_len = samples_per_frame // 8 * bitrate // sample_rate + padding
+        
+        duration += samples_per_frame / sample_rate
+        pos += frame_len
+    
+    return duration
+
+
+def _pydub_duration(data: bytes) -> float:
+    """Duration by decoding with pydub, for MP3s the header scan cannot read."""
+    try:
+        from pydub import AudioSegment  # heavy (probes ffmpeg); imported only when needed
+    except ImportError:
+        return 0.0
+    return len(AudioSegment.from_file(io.BytesIO(data), format="mp3")) / 1000.0
 
 
 class Provider(Enum):
@@ -61,7 +174,34 @@ class Emotion(Enum):
     CUTE = "cute"
 
 
-@dataclass
+# Keywords for _detect_emotion, in priority order (earlier emotions win)
+_EMOTION_KEYWORDS = {
+    Emotion.HAPPY: ["！", "!", "开心", "高兴", "太好了"],
+    Emotion.SAD: ["哭", "悲伤", "难过", "唉"],
+    Emotion.ANGRY: ["生气", "怒", "可恶"],
+    Emotion.SURPRISED: ["哇", "啊", "什么", "惊讶"],
+}
+# "[emotion] dialogue" script lines
+_TAG_RE = re.compile(r"^\[([^\]]+)\]\s*(.*)$")
+
+# Azure SSML body, filled with % (XML-escaped values) so the template is parsed once
+_AZURE_SSML_TMPL = (
+    '<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" '
+    'xmlns:mstts="https://www.w3.org/2001/mstts" xml:lang="zh-CN">'
+    '<voice name="%(voice)s"><mstts:express-as style="%(emotion)s">'
+    '<prosody rate="%(speed)s" pitch="%(pitch)sst">%(text)s</prosody>'
+    '</mstts:express-as></voice></speak>'
+)
+_XML_ATTR_ENTITIES = {'"': "&quot;"}
+
+# All keywords in one pattern; the named group says which emotion matched
+_EMOTION_PATTERN = re.compile("|".join(
+    f"(?P<{emotion.name}>{'|'.join(map(re.escape, words))})"
+    for emotion, words in _EMOTION_KEYWORDS.items()
+))
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class VoiceParams:
     """Parameters for voice generation."""
     # Text
@@ -87,12 +227,15 @@ class VoiceParams:
     format: str = "mp3"
     sample_rate: int = 44100
     output_path: Optional[str] = None
+    
+    # Extra settings from a VoiceProfile
+    base_params: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class GeneratedAudio:
     """Result of voice generation."""
-    audio_data: bytes
+    audio_data: Union[bytes, bytearray]  # bytearray when streamed from a provider
     format: str  # mp3, wav, etc.
     duration: float  # seconds
     sample_rate: int
@@ -104,7 +247,7 @@ class GeneratedAudio:
     local_path: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class VoiceProfile:
     """Voice profile for character consistency."""
     name: str
@@ -115,6 +258,13 @@ class VoiceProfile:
     custom_pronunciations: Dict[str, Dict] = field(default_factory=dict)
 
 
+@dataclass(**_DATACLASS_SLOTS)
+class _ProviderStats:
+    """Observed health of one provider, used to order AUTO fallback."""
+    latency: Optional[float] = None  # EMA of successful call time (s)
+    failures: int = 0  # failures since the last success, halved at each re-sort
+
+
 class VoiceGeneratorError(Exception):
     """Base exception for voice generation."""
     pass
@@ -125,11 +275,75 @@ class ProviderNotAvailableError(VoiceGeneratorError):
     pass
 
 
-class RateLimitError(VoiceGeneratorError):
+class TransientError(VoiceGeneratorError):
+    """Raised on errors worth retrying on the same provider (429/5xx)."""
+    
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitError(TransientError):
     """Raised when rate limit is exceeded."""
     pass
 
 
+async def _read_body(response: aiohttp.ClientResponse) -> bytearray:
+    """Stream the body into one buffer, pre-sized from Content-Length when sent."""
+    buf = bytearray(response.content_length or 0)
+    off = 0
+    async for chunk in response.content.iter_chunked(_READ_CHUNK):
+        # In-place while within the announced size; grows the buffer past it
+        buf[off:off + len(chunk)] = chunk
+        off += len(chunk)
+    del buf[off:]
+    return buf
+
+
+async def _raise_for_response(provider: str, response: aiohttp.ClientResponse):
+    """Raise for a non-200 response; 429 and 5xx raise retryable errors."""
+    if response.status == 200:
+        return
+    body = await response.text()
+    try:
+        retry_after = max(0.0, float(response.headers["Retry-After"]))
+    except (KeyError, ValueError):
+        retry_after = None
+    if response.status == 429:
+        raise RateLimitError(f"{provider} rate limit exceeded", retry_after)
+    if response.status >= 500:
+        raise TransientError(f"{provider} error ({response.status}): {body}", retry_after)
+    raise VoiceGeneratorError(f"{provider} error ({response.status}): {body}")
+
+
+@functools.lru_cache(maxsize=32)
+def _provider_order_for(requested: Provider, fallbacks: Tuple[str, ...]) -> Tuple[Provider, ...]:
+    """Providers to try for a request, in order."""
+    if requested != Provider.AUTO:
+        return (requested,)
+    return tuple(Provider(p) for p in fallbacks)
+
+
+# One HTTP session (and connection pool) shared by every generator on the
+# running event loop, so keep-alive connections and DNS lookups are reused
+_SHARED_SESSION: Optional[aiohttp.ClientSession] = None
+_SHARED_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_SESSION_REFS = 0
+
+
+def _new_session(http: Dict) -> aiohttp.ClientSession:
+    """Create the pooled HTTP session (owns its connector, closed with it)."""
+    connector = aiohttp.TCPConnector(
+        limit=int(os.environ.get("AI_VOICE_GEN_POOL_SIZE", http.get("pool_size", 100))),
+        limit_per_host=http.get("limit_per_host", 20),
+        ttl_dns_cache=http.get("ttl_dns_cache", 300),
+        keepalive_timeout=http.get("keepalive_timeout", 75),
+        enable_cleanup_closed=True,
+    )
+    timeout = aiohttp.ClientTimeout(total=60)
+    return aiohttp.ClientSession(connector=connector, timeout=timeout)
+
+
 class AnimeVoiceGenerator:
     """
     Unified AI voice generator for anime/cartoon production.
@@ -145,6 +359,37 @@ class AnimeVoiceGenerator:
         self.session = None
         self._voice_cache = {}
         self._cloned_voices = {}
+        # (preset, provider) -> provider voice, flattened once from voice_presets
+        self._voice_lookup: Dict[Tuple[str, str], str] = {
+            (preset, provider): voice
+            for preset, mapping in self.config.get("voice_presets", {}).items()
+            for provider, voice in mapping.items()
+        }
+        # Enabled providers in AUTO order; re-sorted by _provider_stats as calls complete
+        providers = self.config.get("providers", {})
+        self._enabled_providers: List[Provider] = [
+            Provider(p) for p in self.config.get("fallback_order", [])
+            if providers.get(p, {}).get("enabled")
+        ]
+        self._provider_stats = {p: _ProviderStats() for p in self._enabled_providers}
+        self._provider_calls = 0
+        # Request headers are the same for every call; built once
+        self._eleven_headers = {
+            "Accept": "application/json",
+            "xi-api-key": os.environ.get("ELEVENLABS_API_KEY"),
+            "Content-Type": "application/json"
+        }
+        self._openai_headers = {
+            "Authorization": f"Bearer {os.environ.get('OPENAI_API_KEY')}",
+            "Content-Type": "application/json"
+        }
+        # ElevenLabs voice_settings per emotion; shared by payloads, never mutated
+        self._voice_settings: Dict[str, Dict[str, Any]] = {}
+        # ANIME_VOICE_NO_CACHE=1 disables the on-disk TTS cache
+        cache_dir = self.config.get("cache_dir")
+        if os.environ.get("ANIME_VOICE_NO_CACHE") == "1" or not cache_dir:
+            cache_dir = None
+        self._cache_dir = Path(cache_dir) if cache_dir else None
         
     def _load_config(self, config_path: Optional[str] = None) -> Dict:
         """Load configuration."""
@@ -188,6 +433,15 @@ class AnimeVoiceGenerator:
             },
             "voice_presets": self._default_voice_presets(),
             "emotion_presets": self._default_emotion_presets(),
+            "http": {
+                "pool_size": 100,  # total pooled connections (env: AI_VOICE_GEN_POOL_SIZE)
+                "limit_per_host": 20,
+                "ttl_dns_cache": 300,
+                "keepalive_timeout": 75
+            },
+            # Synthesized audio is cached here by its parameters (None = off)
+            "cache_dir": str(Path.home() / ".cache" / "anime_voice"),
+            "cache_ttl": CACHE_TTL,
             "output": {
                 "format": "mp3",
                 "sample_rate": 44100,
@@ -196,10 +450,14 @@ class AnimeVoiceGenerator:
             }
         }
         
-        if config_path and Path(config_path).exists():
-            with open(config_path) as f:
-                user_config = yaml.safe_load(f) or {}
-            default_config.update(user_config)
+        if config_path:
+            # A pre-converted providers.json next to the YAML loads faster
+            path = Path(config_path)
+            if path.with_suffix(".json").exists():
+                path = path.with_suffix(".json")
+            if path.exists():
+                user_config = _load_config_file(str(path), path.stat().st_mtime_ns)
+                default_config.update(copy.deepcopy(user_config))
         
         return default_config
     
@@ -247,18 +505,58 @@ class AnimeVoiceGenerator:
         }
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create HTTP session."""
-        if self.session is None or self.session.closed:
-            timeout = aiohttp.ClientTimeout(total=60)
-            self.session = aiohttp.ClientSession(timeout=timeout)
+        """Get the shared HTTP session, creating it for this event loop if needed."""
+        global _SHARED_SESSION, _SHARED_LOOP, _SESSION_REFS
+        # No await between check and assignment, so this is atomic on the loop
+        loop = asyncio.get_running_loop()
+        if _SHARED_SESSION is None or _SHARED_SESSION.closed or _SHARED_LOOP is not loop:
+            _SHARED_SESSION = _new_session(self.config.get("http", {}))
+            _SHARED_LOOP = loop
+            _SESSION_REFS = 0
+        if self.session is not _SHARED_SESSION:
+            self.session = _SHARED_SESSION
+            _SESSION_REFS += 1
         return self.session
     
+    async def _with_retry(
+        self,
+        coro_factory: Callable[[], Awaitable[Any]],
+        *,
+        max_attempts: int = _RETRY_MAX_ATTEMPTS,
+        base: float = _RETRY_BASE_DELAY
+    ) -> Any:
+        """Await coro_factory(), retrying transient failures with jittered exponential backoff."""
+        for attempt in range(max_attempts):
+            try:
+                return await coro_factory()
+            except (TransientError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if attempt == max_attempts - 1:
+                    raise
+                delay = getattr(e, "retry_after", None)
+                if delay is None:
+                    delay = min(_RETRY_MAX_DELAY, base * 2 ** attempt + random.random() * 0.2)
+                await asyncio.sleep(delay)
+    
     def _get_emotion_params(self, emotion: Emotion) -> Dict[str, float]:
         """Get generation parameters for emotion."""
         emotion_str = emotion.value if isinstance(emotion, Emotion) else emotion
         presets = self.config.get("emotion_presets", {})
         return presets.get(emotion_str, presets.get("neutral", {"stability": 0.7, "similarity": 0.8, "style": 0.0}))
     
+    def _get_voice_settings(self, emotion: Emotion) -> Dict[str, Any]:
+        """ElevenLabs voice_settings for emotion, built once per emotion."""
+        key = emotion.value if isinstance(emotion, Emotion) else emotion
+        settings = self._voice_settings.get(key)
+        if settings is None:
+            emotion_params = self._get_emotion_params(emotion)
+            settings = self._voice_settings[key] = {
+                "stability": emotion_params.get("stability", 0.5),
+                "similarity_boost": emotion_params.get("similarity", 0.75),
+                "style": emotion_params.get("style", 0.0),
+                "use_speaker_boost": True
+            }
+        return settings
+    
     async def generate_dialogue(
         self,
         text: str,
@@ -316,39 +614,156 @@ class AnimeVoiceGenerator:
         )
         return await self._generate(params)
     
+    def _cache_key(self, params: VoiceParams) -> Optional[str]:
+        """SHA-256 of everything that affects the synthesized audio."""
+        if self._cache_dir is None:
+            return None
+        providers = self.config.get("providers", {})
+        emotion_params = self._get_emotion_params(params.emotion)
+        fields = {
+            "provider": params.provider.value,
+            "model": [
+                providers.get(p.value, {}).get("model")
+                for p in _provider_order_for(params.provider, tuple(self.config.get("fallback_order", ())))
+            ],
+            "voice": params.voice,
+            "voice_id": params.voice_id,
+            "text": params.text,
+            "emotion": params.emotion.value if isinstance(params.emotion, Emotion) else params.emotion,
+            "stability": emotion_params.get("stability", params.stability),
+            "similarity": emotion_params.get("similarity", params.similarity),
+            "style": emotion_params.get("style", params.style),
+            "speed": params.speed,
+            "pitch": params.pitch,
+            "format": params.format,
+        }
+        blob = json.dumps(fields, sort_keys=True, ensure_ascii=False).encode()
+        return hashlib.sha256(blob).hexdigest()
+    
+    def _cache_get(self, key: str, params: VoiceParams) -> Optional[GeneratedAudio]:
+        """Cached audio for key, or None when missing or older than the TTL."""
+        base = self._cache_dir / key
+        try:
+            meta = json.loads(base.with_suffix(".json").read_bytes())
+            if time.time() - meta["mtime"] > self.config.get("cache_ttl", CACHE_TTL):
+                return None
+            audio_data = base.with_suffix(f".{meta['format']}").read_bytes()
+        except (OSError, ValueError, KeyError):
+            return None
+        
+        return GeneratedAudio(
+            audio_data=audio_data,
+            format=meta["format"],
+            duration=meta["duration"],
+            sample_rate=meta["sample_rate"],
+            channels=meta["channels"],
+            provider=Provider(meta["provider"]),
+            voice_id=meta["voice_id"],
+            text=params.text,
+            metadata={**meta["metadata"], "cache_hit": True}
+        )
+    
+    def _cache_put(self, key: str, audio: GeneratedAudio):
+        """Save audio plus its metadata sidecar under key."""
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        base = self._cache_dir / key
+        base.with_suffix(f".{audio.format}").write_bytes(audio.audio_data)
+        meta = {
+            "format": audio.format,
+            "duration": audio.duration,
+            "sample_rate": audio.sample_rate,
+            "channels": audio.channels,
+            "provider": audio.provider.value,
+            "voice_id": audio.voice_id,
+            "metadata": audio.metadata,
+            "mtime": time.time(),
+        }
+        # Sidecar last: its presence marks a complete entry
+        base.with_suffix(".json").write_text(json.dumps(meta, ensure_ascii=False))
+    
     async def _generate(self, params: VoiceParams) -> GeneratedAudio:
+        """Generation backed by the on-disk TTS cache."""
+        key = self._cache_key(params)
+        if key:
+            cached = await asyncio.to_thread(self._cache_get, key, params)
+            if cached:
+                return cached
+        
+        audio = await self._generate_uncached(params)
+        
+        if key:
+            try:
+                await asyncio.to_thread(self._cache_put, key, audio)
+            except OSError as e:
+                print(f"Failed to cache audio: {e}")
+        return audio
+    
+    async def _generate_uncached(self, params: VoiceParams) -> GeneratedAudio:
         """Internal generation with provider fallback."""
         providers = self._get_provider_order(params.provider)
         
+        if not providers:
+            raise ProviderNotAvailableError("No voice providers are enabled")
+        
         last_error = None
         for provider in providers:
+            start = time.monotonic()
             try:
                 if provider == Provider.ELEVENLABS:
-                    return await self._generate_elevenlabs(params)
+                    audio = await self._generate_elevenlabs(params)
                 elif provider == Provider.AZURE:
-                    return await self._generate_azure(params)
+                    audio = await self._generate_azure(params)
                 elif provider == Provider.OPENAI:
-                    return await self._generate_openai(params)
+                    audio = await self._generate_openai(params)
                 elif provider == Provider.GOOGLE:
-                    return await self._generate_google(params)
+                    audio = await self._generate_google(params)
                 elif provider == Provider.COQUI:
-                    return await self._generate_coqui(params)
+                    audio = await self._generate_coqui(params)
+                else:
+                    continue
             except ProviderNotAvailableError as e:
                 last_error = e
+                self._record_provider(provider, None)
                 continue
             except Exception as e:
                 last_error = e
+                self._record_provider(provider, None)
                 continue
+            self._record_provider(provider, time.monotonic() - start)
+            return audio
         
         raise VoiceGeneratorError(f"All providers failed: {last_error}")
     
-    def _get_provider_order(self, provider: Provider) -> List[Provider]:
-        """Get ordered list of providers."""
+    def _get_provider_order(self, provider: Provider) -> Tuple[Provider, ...]:
+        """Get ordered providers: the requested one, or the enabled ones by observed health."""
         if provider != Provider.AUTO:
-            return [provider]
+            return (provider,)
+        return tuple(self._enabled_providers)
+    
+    def _record_provider(self, provider: Provider, elapsed: Optional[float]):
+        """Update provider stats (elapsed None = failure); periodically re-sort AUTO order."""
+        stats = self._provider_stats.get(provider)
+        if stats is None:
+            return
+        if elapsed is None:
+            stats.failures += 1
+        else:
+            stats.failures = 0
+            if stats.latency is None:
+                stats.latency = elapsed
+            else:
+                stats.latency += _LATENCY_EMA_ALPHA * (elapsed - stats.latency)
         
-        fallbacks = self.config.get("fallback_order", [])
-        return [Provider(p) for p in fallbacks]
+        self._provider_calls += 1
+        if self._provider_calls % _REORDER_EVERY == 0:
+            # Stable sort: unmeasured providers keep their configured place behind measured ones
+            self._enabled_providers.sort(key=lambda p: (
+                self._provider_stats[p].failures,
+                self._provider_stats[p].latency if self._provider_stats[p].latency is not None else float("inf")
+            ))
+            # Decay failures so a demoted provider can recover its place after an outage
+            for stats in self._provider_stats.values():
+                stats.failures //= 2
     
     async def _generate_elevenlabs(self, params: VoiceParams) -> GeneratedAudio:
         """Generate using ElevenLabs."""
@@ -356,63 +771,41 @@ class AnimeVoiceGenerator:
         if not config.get("enabled"):
             raise ProviderNotAvailableError("ElevenLabs not enabled")
         
-        api_key = os.environ.get("ELEVENLABS_API_KEY")
-        
         # Get voice ID
         voice_id = params.voice_id
         if not voice_id:
-            voice_presets = self.config.get("voice_presets", {})
-            voice_id = voice_presets.get(params.voice, {}).get("elevenlabs", params.voice)
-        
-        # Get emotion parameters
-        emotion_params = self._get_emotion_params(params.emotion)
+            voice_id = self._voice_lookup.get((params.voice, "elevenlabs"), params.voice)
         
         session = await self._get_session()
-        headers = {
-            "Accept": "application/json",
-            "xi-api-key": api_key,
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "text": params.text,
             "model_id": "eleven_multilingual_v2",
-            "voice_settings": {
-                "stability": emotion_params.get("stability", 0.5),
-                "similarity_boost": emotion_params.get("similarity", 0.75),
-                "style": emotion_params.get("style", 0.0),
-                "use_speaker_boost": True
-            }
+            "voice_settings": self._get_voice_settings(params.emotion)
         }
         
-        async with session.post(
-            f"{config['api_url']}/voices/{voice_id}/text-to-speech",
-            headers=headers,
-            json=payload
-        ) as response:
-            if response.status == 429:
-                raise RateLimitError("ElevenLabs rate limit exceeded")
-            if response.status != 200:
-                error = await response.text()
-                raise VoiceGeneratorError(f"ElevenLabs error: {error}")
-            
-            audio_data = await response.read()
-            
-            # Get duration
-            audio = AudioSegment.from_mp3(io.BytesIO(audio_data))
-            duration = len(audio) / 1000.0
-            
-            return GeneratedAudio(
-                audio_data=audio_data,
-                format="mp3",
-                duration=duration,
-                sample_rate=44100,
-                channels=1,
-                provider=Provider.ELEVENLABS,
-                voice_id=voice_id,
-                text=params.text,
-                metadata={"model": "eleven_multilingual_v2"}
-            )
+        async def _post() -> bytearray:
+            async with session.post(
+                f"{config['api_url']}/voices/{voice_id}/text-to-speech",
+                headers=self._eleven_headers,
+                json=payload
+            ) as response:
+                await _raise_for_response("ElevenLabs", response)
+                return await _read_body(response)
+        
+        audio_data = await self._with_retry(_post)
+        duration = _mp3_duration(audio_data) or _pydub_duration(audio_data)
+        
+        return GeneratedAudio(
+            audio_data=audio_data,
+            format="mp3",
+            duration=duration,
+            sample_rate=44100,
+            channels=1,
+            provider=Provider.ELEVENLABS,
+            voice_id=voice_id,
+            text=params.text,
+            metadata={"model": "eleven_multilingual_v2"}
+        )
     
     async def _generate_azure(self, params: VoiceParams) -> GeneratedAudio:
         """Generate using Azure TTS."""
@@ -424,21 +817,16 @@ class AnimeVoiceGenerator:
         region = config.get("region", "eastus")
         
         # Build SSML
-        voice_name = params.voice
-        voice_presets = self.config.get("voice_presets", {})
-        voice_name = voice_presets.get(params.voice, {}).get("azure", params.voice)
+        voice_name = self._voice_lookup.get((params.voice, "azure"), params.voice)
         
-        emotion_params = self._get_emotion_params(params.emotion)
-        
-        ssml = f"""<speak version="1.0" xmlns="http://www.w3.org/2001/10/synthesis" xmlns:mstts="https://www.w3.org/2001/mstts" xml:lang="zh-CN">
-            <voice name="{voice_name}">
-                <mstts:express-as style="{params.emotion.value}">
-                    <prosody rate="{params.speed}" pitch="{params.pitch}st">
-                        {params.text}
-                    </prosody>
-                </mstts:express-as>
-            </voice>
-        </speak>"""
+        # UTF-8 bytes, ready to post as the request body
+        ssml = (_AZURE_SSML_TMPL % {
+            "voice": escape(voice_name, _XML_ATTR_ENTITIES),
+            "emotion": params.emotion.value,
+            "speed": params.speed,
+            "pitch": params.pitch,
+            "text": escape(params.text)
+        }).encode("utf-8")
         
         # For now, raise not implemented - Azure requires specific SDK
         raise ProviderNotAvailableError("Azure TTS - requires Azure SDK setup")
@@ -449,52 +837,46 @@ class AnimeVoiceGenerator:
         if not config.get("enabled"):
             raise ProviderNotAvailableError("OpenAI not enabled")
         
-        api_key = os.environ.get("OPENAI_API_KEY")
-        
         # Map voice preset to OpenAI voice
-        voice_presets = self.config.get("voice_presets", {})
-        voice_name = voice_presets.get(params.voice, {}).get("openai", "alloy")
+        voice_name = self._voice_lookup.get((params.voice, "openai"), "alloy")
         
+        fmt = "wav" if params.format == "wav" else "mp3"
         session = await self._get_session()
-        headers = {
-            "Authorization": f"Bearer {api_key}",
-            "Content-Type": "application/json"
-        }
-        
         payload = {
             "model": config.get("model", "tts-1"),
             "input": params.text,
             "voice": voice_name,
-            "response_format": "mp3",
+            "response_format": fmt,
             "speed": params.speed
         }
         
-        async with session.post(
-            f"{config['api_url']}/audio/speech",
-            headers=headers,
-            json=payload
-        ) as response:
-            if response.status != 200:
-                error = await response.text()
-                raise VoiceGeneratorError(f"OpenAI error: {error}")
-            
-            audio_data = await response.read()
-            
-            # Get duration
-            audio = AudioSegment.from_mp3(io.BytesIO(audio_data))
-            duration = len(audio) / 1000.0
-            
-            return GeneratedAudio(
-                audio_data=audio_data,
-                format="mp3",
-                duration=duration,
-                sample_rate=44100,
-                channels=1,
-                provider=Provider.OPENAI,
-                voice_id=voice_name,
-                text=params.text,
-                metadata={"model": payload["model"]}
-            )
+        async def _post() -> bytearray:
+            async with session.post(
+                f"{config['api_url']}/audio/speech",
+                headers=self._openai_headers,
+                json=payload
+            ) as response:
+                await _raise_for_response("OpenAI", response)
+                return await _read_body(response)
+        
+        audio_data = await self._with_retry(_post)
+        if fmt == "wav":
+            duration, sample_rate, channels = _wav_metadata(audio_data)
+        else:
+            duration = _mp3_duration(audio_data) or _pydub_duration(audio_data)
+            sample_rate, channels = 44100, 1
+        
+        return GeneratedAudio(
+            audio_data=audio_data,
+            format=fmt,
+            duration=duration,
+            sample_rate=sample_rate,
+            channels=channels,
+            provider=Provider.OPENAI,
+            voice_id=voice_name,
+            text=params.text,
+            metadata={"model": payload["model"]}
+        )
     
     async def _generate_google(self, params: VoiceParams) -> GeneratedAudio:
         """Generate using Google TTS."""
@@ -604,6 +986,34 @@ class AnimeVoiceGenerator:
         params.base_params.update(profile.base_params)
         return await self._generate(params)
     
+    def _batch_concurrency(self, provider: Provider) -> int:
+        """Concurrent requests for a batch: the provider's per-second voice budget, at least 4."""
+        name = provider.value if provider != Provider.AUTO else self.config.get("primary_provider", "elevenlabs")
+        vpm = self.config.get("providers", {}).get(name, {}).get("voices_per_minute", 0)
+        return max(vpm // 60, 4)
+    
+    async def generate_batch(
+        self,
+        texts: List[str],
+        voice: str = "young_female",
+        emotion: Emotion = Emotion.NEUTRAL,
+        provider: Provider = Provider.AUTO,
+        **kwargs
+    ) -> List[GeneratedAudio]:
+        """
+        Generate several texts concurrently with the same voice settings.
+        
+        Returns:
+            GeneratedAudio per text, in input order (join with concat_audio)
+        """
+        sem = asyncio.Semaphore(self._batch_concurrency(provider))
+        
+        async def _one(text: str) -> GeneratedAudio:
+            async with sem:
+                return await self.generate_dialogue(text, voice, emotion, provider, **kwargs)
+        
+        return list(await asyncio.gather(*(_one(text) for text in texts)))
+    
     async def batch_generate(
         self,
         script: str,
@@ -617,75 +1027,102 @@ class AnimeVoiceGenerator:
         # Parse script
         lines = self._parse_script(script)
         
-        results = []
         output_path = Path(output_dir) if output_dir else Path.cwd() / "audio"
         output_path.mkdir(parents=True, exist_ok=True)
         
-        for i, line in enumerate(lines):
-            try:
-                emotion = emotions[0] if emotions else self._detect_emotion(line)
-                
-                audio = await self.generate_dialogue(
-                    text=line["text"],
+        sem = asyncio.Semaphore(self._batch_concurrency(provider))
+        
+        detected = None if emotions else self._detect_emotions([line["text"] for line in lines])
+        
+        # Repeated (text, emotion) lines share one synthesis
+        unique: Dict[Tuple[str, Emotion], asyncio.Task] = {}
+        
+        async def _synth(text: str, emotion: Emotion) -> GeneratedAudio:
+            async with sem:
+                return await self.generate_dialogue(
+                    text=text,
                     voice=voice,
                     emotion=emotion,
                     provider=provider,
                     **kwargs
                 )
-                
-                # Save to disk
-                filename = f"line_{i+1:04d}.{audio.format}"
-                local_path = output_path / filename
-                with open(local_path, "wb") as f:
-                    f.write(audio.audio_data)
-                audio.local_path = str(local_path)
-                
-                results.append(audio)
-                
-            except Exception as e:
-                print(f"Failed to generate line {i+1}: {e}")
-                continue
         
+        async def _one(i: int, line: Dict) -> GeneratedAudio:
+            emotion = emotions[0] if emotions else detected[i]
+            key = (line["text"], emotion)
+            task = unique.get(key)
+            if task is None:
+                task = unique[key] = asyncio.create_task(_synth(*key))
+            # Copy so each line gets its own local_path
+            audio = replace(await task)
+            
+            # Save to disk
+            local_path = output_path / f"line_{i+1:04d}.{audio.format}"
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(_WRITE_EXECUTOR, local_path.write_bytes, audio.audio_data)
+            audio.local_path = str(local_path)
+            return audio
+        
+        outcomes = await asyncio.gather(
+            *(_one(i, line) for i, line in enumerate(lines)),
+            return_exceptions=True
+        )
+        
+        results = []
+        for i, outcome in enumerate(outcomes):
+            if isinstance(outcome, BaseException):
+                print(f"Failed to generate line {i+1}: {outcome}")
+            else:
+                results.append(outcome)
         return results
     
     def _parse_script(self, script: str) -> List[Dict]:
         """Parse dialogue script."""
         lines = []
-        for line in script.strip().split("\n"):
+        for line in script.splitlines():
             line = line.strip()
             if not line:
                 continue
             
             # Parse emotion tag and dialogue
-            if line.startswith("[") and "]":
-                end_tag = line.index("]")
-                emotion = line[1:end_tag]
-                dialogue = line[end_tag+1:].strip()
-                lines.append({"emotion": emotion, "text": dialogue})
+            match = _TAG_RE.match(line)
+            if match:
+                lines.append({"emotion": match.group(1), "text": match.group(2)})
             else:
                 lines.append({"emotion": "neutral", "text": line})
         
         return lines
     
     def _detect_emotion(self, text: str) -> Emotion:
-        """Detect emotion from text."""
-        text_lower = text.lower()
-        
-        if any(w in text_lower for w in ["！", "!", "开心", "高兴", "太好了"]):
-            return Emotion.HAPPY
-        elif any(w in text_lower for w in ["哭", "悲伤", "难过", "唉"]):
-            return Emotion.SAD
-        elif any(w in text_lower for w in ["生气", "怒", "可恶"]):
-            return Emotion.ANGRY
-        elif any(w in text_lower for w in ["哇", "啊", "什么", "惊讶"]):
-            return Emotion.SURPRISED
-        else:
-            return Emotion.NEUTRAL
+        """Detect emotion from text (one regex pass over all keywords)."""
+        found = {m.lastgroup for m in _EMOTION_PATTERN.finditer(text.lower())}
+        for emotion in _EMOTION_KEYWORDS:
+            if emotion.name in found:
+                return emotion
+        return Emotion.NEUTRAL
+    
+    def _detect_emotions(self, texts: List[str]) -> List[Emotion]:
+        """Detect emotion for many lines with one regex pass over the joined text."""
+        lowered = [t.lower() for t in texts]
+        starts = list(itertools.accumulate((len(t) + 1 for t in lowered[:-1]), initial=0))
+        found = [set() for _ in lowered]
+        # Keywords never contain a newline, so no match spans two lines
+        for m in _EMOTION_PATTERN.finditer("\n".join(lowered)):
+            found[bisect.bisect_right(starts, m.start()) - 1].add(m.lastgroup)
+        return [
+            next((e for e in _EMOTION_KEYWORDS if e.name in names), Emotion.NEUTRAL)
+            for names in found
+        ]
     
     async def close(self):
-        """Close HTTP session."""
-        if self.session and not self.session.closed:
-            await self.session.close()
+        """Release the shared HTTP session; the last generator using it closes it."""
+        global _SESSION_REFS
+        session, self.session = self.session, None
+        if session is None or session is not _SHARED_SESSION:
+            return
+        _SESSION_REFS -= 1
+        if _SESSION_REFS <= 0:
+            await close_shared_session()
     
     async def __aenter__(self):
         return self
@@ -694,6 +1131,73 @@ class AnimeVoiceGenerator:
         await self.close()
 
 
+def concat_audio(clips: List[GeneratedAudio]) -> GeneratedAudio:
+    """Join clips of one format back to back (MP3 frames as-is, WAV frames re-wrapped)."""
+    first = clips[0]
+    if any(c.format != first.format for c in clips):
+        raise VoiceGeneratorError("Cannot concatenate clips of different formats")
+    if len(clips) == 1:
+        return first
+    
+    if first.format == "wav":
+        out = io.BytesIO()
+        sample_format = None
+        with wave.open(out, "wb") as dst:
+            for clip in clips:
+                with wave.open(io.BytesIO(clip.audio_data), "rb") as src:
+                    fmt = (src.getnchannels(), src.getsampwidth(), src.getframerate())
+                    if sample_format is None:
+                        sample_format = fmt
+                        dst.setnchannels(fmt[0])
+                        dst.setsampwidth(fmt[1])
+                        dst.setframerate(fmt[2])
+                    elif fmt != sample_format:
+                        raise VoiceGeneratorError("Cannot concatenate WAVs with different sample formats")
+                    dst.writeframes(src.readframes(src.getnframes()))
+        audio_data = out.getvalue()
+    else:
+        # MP3 is a stream of self-contained frames; players skip tags between them
+        audio_data = b"".join(c.audio_data for c in clips)
+    
+    return replace(
+        first,
+        audio_data=audio_data,
+        duration=sum(c.duration for c in clips),
+        text=" ".join(c.text for c in clips),
+        metadata={**first.metadata, "chunks": len(clips)},
+        local_path=None
+    )
+
+
+_default_generator: Optional[AnimeVoiceGenerator] = None
+
+
+async def close_shared_session():
+    """Close the shared HTTP session (call before the event loop exits)."""
+    global _SHARED_SESSION, _SHARED_LOOP, _SESSION_REFS, _default_generator
+    session, loop = _SHARED_SESSION, _SHARED_LOOP
+    _SHARED_SESSION = _SHARED_LOOP = _default_generator = None
+    _SESSION_REFS = 0
+    if session is not None and not session.closed and loop is asyncio.get_running_loop():
+        await session.close()
+
+
+@atexit.register
+def _close_shared_session_at_exit():
+    """Close a session left open on a loop that can still run."""
+    loop = _SHARED_LOOP
+    if _SHARED_SESSION is not None and loop is not None and not loop.is_closed() and not loop.is_running():
+        loop.run_until_complete(close_shared_session())
+
+
+def _get_default() -> AnimeVoiceGenerator:
+    """Get or create the generator shared by convenience calls."""
+    global _default_generator
+    if _default_generator is None:
+        _default_generator = AnimeVoiceGenerator()
+    return _default_generator
+
+
 # Convenience function
 async def generate_voice(
     text: str,
@@ -702,15 +1206,14 @@ async def generate_voice(
     provider: str = "auto",
     **kwargs
 ) -> GeneratedAudio:
-    """Quick voice generation function."""
-    async with AnimeVoiceGenerator() as generator:
-        return await generator.generate_dialogue(
-            text=text,
-            voice=voice,
-            emotion=Emotion(emotion),
-            provider=Provider(provider),
-            **kwargs
-        )
+    """Quick voice generation function (reuses one generator and its connections)."""
+    return await _get_default().generate_dialogue(
+        text=text,
+        voice=voice,
+        emotion=Emotion(emotion),
+        provider=Provider(provider),
+        **kwargs
+    )
 
 
 if __name__ == "__main__":
@@ -718,7 +1221,8 @@ if __name__ == "__main__":
     
     async def main():
         if len(sys.argv) < 2:
-            print("Usage: python voice_generator.py <text>")
+            print("Usage: python voice_generator.py <text> [voice] [emotion]")
+            print("       python voice_generator.py --daemon  (JSON lines on stdin)")
             return
         
         text = sys.argv[1]
@@ -745,5 +1249,62 @@ if __name__ == "__main__":
             
         except Exception as e:
             print(f"Error: {e}")
+        finally:
+            await close_shared_session()
+    
+    async def _daemon_loop(concurrency: int = 4):
+        """Serve JSON-line requests from stdin until EOF with one warm generator.
+        
+        Each line is {"text": ..., "voice"?, "emotion"?, "provider"?, "output"?, "id"?};
+        each reply is {"id", "path", "duration"} or {"id", "error"}, in completion order.
+        """
+        generator = AnimeVoiceGenerator()
+        sem = asyncio.Semaphore(concurrency)
+        pending = set()
+        
+        def _reply(reply: Dict):
+            print(json.dumps(reply, ensure_ascii=False), flush=True)
+        
+        async def _serve(n: int, request: Dict):
+            reply = {"id": request.get("id", n)}
+            try:
+                async with sem:
+                    audio = await generator.generate_dialogue(
+                        text=request["text"],
+                        voice=request.get("voice", "young_female"),
+                        emotion=Emotion(request.get("emotion", "neutral")),
+                        provider=Provider(request.get("provider", "auto"))
+                    )
+                path = request.get("output") or f"voice_{n:04d}.{audio.format}"
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(_WRITE_EXECUTOR, Path(path).write_bytes, audio.audio_data)
+                reply.update(path=path, duration=audio.duration)
+            except Exception as e:
+                reply["error"] = str(e)
+            _reply(reply)
+        
+        try:
+            n = 0
+            while line := await asyncio.to_thread(sys.stdin.readline):
+                if not line.strip():
+                    continue
+                n += 1
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    request = None
+                if not isinstance(request, dict):
+                    _reply({"id": n, "error": "expected a JSON object per line"})
+                    continue
+                task = asyncio.create_task(_serve(n, request))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            if pending:
+                await asyncio.gather(*pending)
+        finally:
+            await generator.close()
     
-    asyncio.run(main())
+    if "--daemon" in sys.argv:
+        asyncio.run(_daemon_loop())
+    else:
+        asyncio.run(main())
@@ -4,10 +4,56 @@ Anime Voice Generator CLI - Voice synthesis script
 """
 
 import os
+import re
 import sys
+import json
+import shutil
+import asyncio
 import argparse
 from pathlib import Path
-from lib.voice_generator import AnimeVoiceGenerator, VoiceProvider, Emotion
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "lib"))
+
+from voice_generator import AnimeVoiceGenerator, VoiceProvider, Emotion, VoiceGeneratorError, concat_audio
+
+# Daemon wire format: one UTF-8 JSON object per line (orjson when installed)
+try:
+    import orjson
+    _json_loads = orjson.loads
+    
+    def _json_line(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+except ImportError:
+    _json_loads = json.loads
+    
+    def _json_line(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode() + b"\n"
+
+# Sentence boundaries for --batch: after 。！？ runs, after .!? followed by a space, or at line breaks
+SENTENCE_SPLIT = re.compile(r"(?<=[。！？])(?![。！？.!?])\s*|(?<=[.!?])\s+|\n+")
+
+# --provider name -> VoiceProvider (unknown names fall back to AUTO)
+PROVIDER_MAP = {
+    "auto": VoiceProvider.AUTO,
+    "elevenlabs": VoiceProvider.ELEVENLABS,
+    "openai": VoiceProvider.OPENAI,
+    "azure": VoiceProvider.AZURE,
+    "coqui": VoiceProvider.COQUI
+}
+
+# narrate --style presets
+STYLE_CONFIGS = {
+    "dramatic": {"speed": 0.9, "pitch": -2},
+    "gentle": {"speed": 1.0, "pitch": 0},
+    "action": {"speed": 1.1, "pitch": 2},
+    "mysterious": {"speed": 0.95, "pitch": -1}
+}
+
+# Unix socket shared by --daemon and --via-daemon
+DAEMON_SOCKET = "/tmp/anime-voice.sock"
+
+# speak --stream player, fed each chunk on stdin
+STREAM_PLAYER = ["ffplay", "-nodisp", "-autoexit", "-loglevel", "error", "-"]
 
 
 def main():
@@ -25,10 +71,24 @@ Examples:
   # Generate with specific provider
   %(prog)s speak "Hello!" --provider elevenlabs --voice my_voice
   
-  # Generate with lip sync data
-  %(prog)s speak "こんにちは" --voice asuka --lipsync --output visemes.json
+  # Long narration, one concurrent request per sentence
+  %(prog)s narrate "長い旅が始まる。彼は歩き出した。" --batch
+  
+  # Start playing the first sentence while the rest is synthesized
+  %(prog)s speak "おはよう！今日もいい天気だね。" --stream
+  
+  # Keep one warm generator running and send requests to it (outputs under --output-dir)
+  %(prog)s --daemon --output-dir . &
+  %(prog)s --via-daemon speak "こんにちは！" --emotion happy
         """
     )
+    parser.add_argument("--daemon", action="store_true",
+                        help="Serve requests on a Unix socket with one warm generator")
+    parser.add_argument("--via-daemon", action="store_true",
+                        help="Send this request to a running --daemon instead of synthesizing locally")
+    parser.add_argument("--socket", default=DAEMON_SOCKET, help="Daemon socket path")
+    parser.add_argument("--output-dir", default=".",
+                        help="--daemon only writes files inside this directory (default: current directory)")
     
     subparsers = parser.add_subparsers(dest="mode", help="Generation mode")
     
@@ -37,7 +97,7 @@ Examples:
     speak_parser.add_argument("text", help="Text to synthesize")
     speak_parser.add_argument("--voice", default="hinata", help="Voice preset or ID")
     speak_parser.add_argument("--emotion", default="neutral",
-                             choices=["neutral", "happy", "sad", "angry", "surprised", "fearful", "calm"],
+                             choices=[e.value for e in Emotion],
                              help="Emotion to convey")
     speak_parser.add_argument("--speed", type=float, default=1.0, help="Speech speed (0.5-2.0)")
     speak_parser.add_argument("--pitch", type=float, default=0.0, help="Pitch adjustment")
@@ -45,100 +105,234 @@ Examples:
     speak_parser.add_argument("--output", "-o", help="Output file path")
     speak_parser.add_argument("--format", default="mp3", help="Output format (mp3/wav)")
     speak_parser.add_argument("--lipsync", action="store_true", help="Generate lip sync data")
+    speak_parser.add_argument("--batch", action="store_true",
+                             help="Synthesize sentences concurrently and join them")
+    speak_parser.add_argument("--stream", action="store_true",
+                             help="Play each sentence as soon as it is ready (needs ffplay)")
     
     # Narrate mode
     narrate_parser = subparsers.add_parser("narrate", help="Generate narration")
     narrate_parser.add_argument("text", help="Narration text")
     narrate_parser.add_argument("--style", default="gentle",
-                               choices=["dramatic", "gentle", "action", "mysterious"],
+                               choices=list(STYLE_CONFIGS),
                                help="Narration style")
     narrate_parser.add_argument("--voice", default="narrator", help="Voice preset")
+    narrate_parser.add_argument("--provider", default="auto", help="Voice provider")
     narrate_parser.add_argument("--output", "-o", help="Output file path")
+    narrate_parser.add_argument("--format", default="mp3", help="Output format (mp3/wav)")
+    narrate_parser.add_argument("--batch", action="store_true",
+                               help="Synthesize sentences concurrently and join them")
     
     args = parser.parse_args()
     
+    if args.daemon:
+        try:
+            return asyncio.run(serve(args.socket, args.output_dir))
+        except KeyboardInterrupt:
+            return 0
+    
     if not args.mode:
         parser.print_help()
         sys.exit(1)
     
-    # Initialize generator
-    generator = AnimeVoiceGenerator()
+    if args.mode == "speak" and args.lipsync:
+        print("⚠️  --lipsync is not supported by the current providers, ignoring")
     
-    # Parse provider
-    provider_map = {
-        "auto": VoiceProvider.AUTO,
-        "elevenlabs": VoiceProvider.ELEVENLABS,
-        "openai": VoiceProvider.OPENAI,
-        "azure": VoiceProvider.AZURE,
-        "coqui": VoiceProvider.COQUI
-    }
-    provider = provider_map.get(args.provider.lower(), VoiceProvider.AUTO)
+    if args.via_daemon:
+        return asyncio.run(run_via_daemon(args))
+    return asyncio.run(run(args))
+
+
+async def synthesize(generator: AnimeVoiceGenerator, args):
+    """Synthesize one speak/narrate request with an open generator and write the output."""
+    provider = PROVIDER_MAP.get(args.provider.lower(), VoiceProvider.AUTO)
     
     if args.mode == "speak":
-        if args.lipsync:
-            result = generator.generate_with_lipsync(
-                text=args.text,
-                voice=args.voice,
-                emotion=args.emotion,
-                provider=provider
-            )
-            
-            # Output viseme data
-            if result.success:
-                output = {
-                    "audio_path": result.audio_path,
-                    "visemes": result.visemes,
-                    "duration": result.duration
-                }
-                print(json.dumps(output, indent=2, ensure_ascii=False))
-            else:
-                print(f"❌ Failed: {result.error}")
-                return 1
-        else:
-            result = generator.generate(
-                text=args.text,
-                voice=args.voice,
-                emotion=args.emotion,
-                speed=args.speed,
-                pitch=args.pitch,
-                provider=provider,
-                output_path=args.output,
-                output_format=args.format
-            )
-    
-    elif args.mode == "narrate":
+        emotion = Emotion(args.emotion)
+        speed, pitch = args.speed, args.pitch
+    
+    else:
         # Apply style presets
-        style_configs = {
-            "dramatic": {"speed": 0.9, "pitch": -2},
-            "gentle": {"speed": 1.0, "pitch": 0},
-            "action": {"speed": 1.1, "pitch": 2},
-            "mysterious": {"speed": 0.95, "pitch": -1}
-        }
-        style = style_configs.get(args.style, {})
+        style = STYLE_CONFIGS.get(args.style, {})
+        emotion = Emotion.NEUTRAL
+        speed, pitch = style.get("speed", 1.0), style.get("pitch", 0.0)
+    
+    output = Path(args.output or f"output.{args.format}")
+    
+    stream = getattr(args, "stream", False)
+    chunks = [args.text]
+    if args.batch or stream:
+        chunks = [c.strip() for c in SENTENCE_SPLIT.split(args.text) if c.strip()] or chunks
+    
+    # Every chunk keeps the same voice, emotion and style settings
+    options = {
+        "voice": args.voice,
+        "emotion": emotion,
+        "provider": provider,
+        "speed": speed,
+        "pitch": pitch,
+        "format": args.format
+    }
+    if stream:
+        results = await stream_chunks(generator, chunks, options)
+    else:
+        results = await generator.generate_batch(chunks, **options)
+    result = concat_audio(results)
+    
+    await asyncio.to_thread(output.write_bytes, result.audio_data)
+    return {
+        "output": str(output),
+        "provider": result.provider.value,
+        "duration": result.duration,
+        "text": result.text or ""
+    }
+
+
+async def stream_chunks(generator: AnimeVoiceGenerator, chunks, options: dict):
+    """Synthesize chunks in order, playing each one while the next is synthesized."""
+    player_cmd = STREAM_PLAYER if shutil.which(STREAM_PLAYER[0]) else None
+    if player_cmd is None:
+        print(f"⚠️  {STREAM_PLAYER[0]} not found, --stream will only save the file")
+    
+    results = []
+    player = None
+    pending = asyncio.create_task(generator.generate_dialogue(chunks[0], **options))
+    try:
+        for i in range(len(chunks)):
+            audio = await pending
+            if i + 1 < len(chunks):
+                pending = asyncio.create_task(generator.generate_dialogue(chunks[i + 1], **options))
+            results.append(audio)
+            
+            if player_cmd is None:
+                continue
+            if player is not None:
+                await player.wait()
+            print(f"▶️  {i + 1}/{len(chunks)}: {chunks[i][:40]}")
+            player = await asyncio.create_subprocess_exec(*player_cmd, stdin=asyncio.subprocess.PIPE)
+            try:
+                player.stdin.write(audio.audio_data)
+                await player.stdin.drain()
+                player.stdin.close()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # player exited early; keep synthesizing so the file is complete
         
-        result = generator.generate(
-            text=args.text,
-            voice=args.voice,
-            emotion="neutral",
-            speed=style.get("speed", 1.0),
-            pitch=style.get("pitch", 0.0),
-            provider=provider,
-            output_path=args.output,
-            output_format=args.format
-        )
-    
-    # Output results
-    if result.success:
-        print(f"✅ Success! Audio saved to: {result.audio_path}")
-        print(f"   Provider: {result.provider}")
-        print(f"   Duration: {result.duration:.2f}s")
-        print(f"   Text: {result.text[:50]}..." if len(result.text or "") > 50 else f"   Text: {result.text}")
-        return 0
+        if player is not None:
+            await player.wait()
+    except BaseException:
+        pending.cancel()
+        raise
+    return results
+
+
+def report(summary: dict):
+    """Print the result lines for a finished synthesis."""
+    text = summary["text"]
+    print(f"✅ Success! Audio saved to: {summary['output']}")
+    print(f"   Provider: {summary['provider']}")
+    print(f"   Duration: {summary['duration']:.2f}s")
+    print(f"   Text: {text[:50]}..." if len(text) > 50 else f"   Text: {text}")
+
+
+async def run(args) -> int:
+    """Run one synthesis with a single generator (and HTTP session)."""
+    async with AnimeVoiceGenerator() as generator:
+        try:
+            summary = await synthesize(generator, args)
+        except VoiceGeneratorError as e:
+            print(f"❌ Failed: {e}")
+            return 1
+    
+    report(summary)
+    return 0
+
+
+def daemon_output(output_dir: Path, args) -> str:
+    """Resolve a daemon request's output path, refusing anything outside output_dir."""
+    output = (output_dir / (args.output or f"output.{args.format}")).resolve()
+    if not output.is_relative_to(output_dir):
+        raise ValueError(f"output must be inside {output_dir}")
+    return str(output)
+
+
+async def serve(socket_path: str, output_dir: str = ".") -> int:
+    """Answer line-delimited JSON requests on a Unix socket with one warm generator.
+    
+    Each request line is the client's parsed arguments; each reply line is the
+    synthesis summary or {"error": ...}. Outputs are confined to output_dir.
+    """
+    try:
+        _, writer = await asyncio.open_unix_connection(socket_path)
+    except FileNotFoundError:
+        pass
+    except ConnectionRefusedError:
+        # Nobody is listening: the file was left behind by a killed daemon
+        os.unlink(socket_path)
     else:
-        print(f"❌ Failed: {result.error}")
+        writer.close()
+        print(f"❌ A voice daemon is already listening on {socket_path}")
         return 1
+    
+    output_dir = Path(output_dir).resolve()
+    async with AnimeVoiceGenerator() as generator:
+        
+        async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            try:
+                while line := await reader.readline():
+                    try:
+                        request = argparse.Namespace(**_json_loads(line))
+                        request.output = daemon_output(output_dir, request)
+                        reply = await synthesize(generator, request)
+                    except Exception as e:
+                        reply = {"error": str(e)}
+                    writer.write(_json_line(reply))
+                    await writer.drain()
+            finally:
+                writer.close()
+        
+        server = await asyncio.start_unix_server(handle, path=socket_path)
+        # Only this user may connect and have files written under output_dir
+        os.chmod(socket_path, 0o600)
+        print(f"🎙️  Voice daemon listening on {socket_path}, writing under {output_dir}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            if os.path.exists(socket_path):
+                os.unlink(socket_path)
+        return 0
+
+
+async def run_via_daemon(args) -> int:
+    """Send one request to a running daemon; synthesize locally if none is listening."""
+    if getattr(args, "stream", False):
+        print("⚠️  --stream plays on this machine, ignoring --via-daemon")
+        return await run(args)
+    
+    try:
+        reader, writer = await asyncio.open_unix_connection(args.socket)
+    except OSError:
+        print(f"⚠️  No voice daemon at {args.socket}, generating locally")
+        return await run(args)
+    
+    request = {k: v for k, v in vars(args).items() if k not in ("daemon", "via_daemon", "socket")}
+    # The daemon has its own working directory, so send an absolute output path
+    request["output"] = str(Path(args.output or f"output.{args.format}").resolve())
+    try:
+        writer.write(_json_line(request))
+        await writer.drain()
+        line = await reader.readline()
+    finally:
+        writer.close()
+    
+    reply = _json_loads(line) if line else {"error": "daemon closed the connection"}
+    if "error" in reply:
+        print(f"❌ Failed: {reply['error']}")
+        return 1
+    
+    report(reply)
+    return 0
 
 
 if __name__ == "__main__":
-    import json
     sys.exit(main())
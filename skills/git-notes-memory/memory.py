@@ -934,7 +934,7 @@ def _init_context(cwd: str = ".") -> Optional[Dict]:
 # CLI
 # =============================================================================
 
-def main():
+def _parser():
     import argparse
 
     p = argparse.ArgumentParser(description="Knowledge Graph Memory v4 (Branch Aware)")
@@ -997,32 +997,34 @@ def main():
 
     sub.add_parser("branches", aliases=["br"])
 
-    args = p.parse_args()
+    return p
+
+def _execute(args) -> Any:
+    """Run a parsed command and return its result (nothing is printed)."""
     cwd = args.path
 
-    # Execute
     if args.cmd == "sync":
         if args.start:
-            print(json.dumps(sync_start(cwd), separators=(',', ':')))
+            return sync_start(cwd)
         elif args.end:
             try:
                 summary = json.loads(args.end)
             except:
                 summary = args.end
-            print(json.dumps(sync_end(summary, cwd), separators=(',', ':')))
+            return sync_end(summary, cwd)
+        return None
     elif args.cmd in ("remember", "r"):
         try:
             content = json.loads(args.content)
         except:
             content = args.content
-        print(remember(content, args.tags, args.importance, cwd))
+        return remember(content, args.tags, args.importance, cwd)
     elif args.cmd in ("recall", "q"):
-        result = recall(args.mid, args.tag, args.query, args.last, cwd)
-        print(json.dumps(result, separators=(',', ':')) if result else "null")
+        return recall(args.mid, args.tag, args.query, args.last, cwd)
     elif args.cmd in ("get", "g"):
-        print(json.dumps(get_topic(args.topic, cwd), separators=(',', ':')))
+        return get_topic(args.topic, cwd)
     elif args.cmd in ("search", "s"):
-        print(json.dumps(search(args.query, cwd), separators=(',', ':')))
+        return search(args.query, cwd)
     elif args.cmd in ("update", "u"):
         content = None
         if args.content:
@@ -1030,21 +1032,40 @@ def main():
                 content = json.loads(args.content)
             except:
                 content = args.content
-        print("ok" if update(args.mid, content, args.importance, args.tags, args.merge, cwd) else "not found")
+        return update(args.mid, content, args.importance, args.tags, args.merge, cwd)
     elif args.cmd in ("evolve", "e"):
-        print("ok" if evolve(args.mid, args.note, cwd) else "not found")
+        return evolve(args.mid, args.note, cwd)
     elif args.cmd in ("forget", "f"):
-        print("ok" if forget(args.mid, cwd) else "not found")
+        return forget(args.mid, cwd)
     elif args.cmd in ("entities", "ent"):
-        print(json.dumps(entities(cwd), separators=(',', ':')))
+        return entities(cwd)
     elif args.cmd == "entity":
-        print(json.dumps(entity(args.name, cwd), separators=(',', ':')))
+        return entity(args.name, cwd)
     elif args.cmd in ("merge-branch", "mb"):
-        print(json.dumps(merge_branch(args.source, cwd), separators=(',', ':')))
+        return merge_branch(args.source, cwd)
     elif args.cmd in ("branches", "br"):
-        print(json.dumps(list_branches(cwd), separators=(',', ':')))
+        return list_branches(cwd)
+    else:
+        return recall(cwd=cwd)
+
+def dispatch(argv: List[str], workspace: str = ".") -> Any:
+    """In-process equivalent of `memory.py -p <workspace> <argv...>`, returning the result."""
+    return _execute(_parser().parse_args(["-p", str(workspace)] + list(argv)))
+
+def main():
+    args = _parser().parse_args()
+    result = _execute(args)
+
+    if args.cmd == "sync" and not (args.start or args.end):
+        return
+    if args.cmd in ("remember", "r"):
+        print(result)
+    elif args.cmd in ("update", "u", "evolve", "e", "forget", "f"):
+        print("ok" if result else "not found")
+    elif args.cmd in ("recall", "q"):
+        print(json.dumps(result, separators=(',', ':')) if result else "null")
     else:
-        print(json.dumps(recall(cwd=cwd), separators=(',', ':')))
+        print(json.dumps(result, separators=(',', ':')))
 
 if __name__ == "__main__":
     main()
@@ -9,25 +9,51 @@ Integrates with git-notes-memory skill for persistent context.
 import subprocess
 import json
 import os
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from datetime import datetime
 
 
+@lru_cache(maxsize=None)
+def _load_memory_module(script: str):
+    """Import memory.py once per process; None if it is missing or fails to import."""
+    try:
+        spec = importlib.util.spec_from_file_location("git_notes_memory", script)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    except Exception:
+        return None
+    return module if hasattr(module, "dispatch") else None
+
+
 class GitNotesMemory:
     """Wrapper for git-notes-memory operations."""
     
     def __init__(self, workspace_path: str = "."):
         self.workspace = Path(workspace_path)
         self.memory_script = Path("/home/zous/clawd/skills/git-notes-memory/memory.py")
+        self._mod = _load_memory_module(str(self.memory_script))
     
     def _run(self, *args) -> dict:
-        """Run memory.py command and return JSON result."""
+        """Run memory.py command and return its result."""
+        if self._mod is not None:
+            # In-process call: no interpreter start-up or JSON round-trip per command
+            try:
+                return self._mod.dispatch(list(args), workspace=str(self.workspace))
+            except SystemExit as e:
+                return {"error": f"invalid arguments: {list(args)} (exit {e.code})"}
+            except Exception as e:
+                return {"error": str(e)}
+        
         cmd = ["python3", str(self.memory_script), "-p", str(self.workspace)] + list(args)
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+            # Bytes in, bytes out: json.loads decodes UTF-8 itself
+            result = subprocess.run(cmd, capture_output=True, stdin=subprocess.DEVNULL, timeout=30)
             if result.returncode == 0:
                 return json.loads(result.stdout)
-            return {"error": result.stderr}
+            return {"error": result.stderr.decode("utf-8", "replace")}
         except Exception as e:
             return {"error": str(e)}
     
@@ -69,13 +95,21 @@ def get_memory_context(workspace: str = ".", query: str = None) -> dict:
     """Get relevant memory context for writing."""
     memory = GitNotesMemory(workspace)
     
-    context = {
-        "session": memory.sync_start(),
-        "entities": memory.entities()
-    }
-    
-    if query:
-        context["related"] = memory.get(query)
+    # sync_start first: on a fresh workspace it creates the repo and writes the
+    # initial notes, which the other lookups would otherwise race
+    context = {"session": memory.sync_start()}
+    
+    if not query:
+        context["entities"] = memory.entities()
+        return context
+    
+    # The store exists now, so these only read (at most re-copying identical
+    # parent-branch notes) and mostly wait on git
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        entities = ex.submit(memory.entities)
+        related = ex.submit(memory.get, query)
+        context["entities"] = entities.result()
+        context["related"] = related.result()
     
     return context
 
@@ -5,6 +5,7 @@ Plays Feishu/Feishu voice messages (OGG/opus format)
 
 Usage:
     python voice_player.py <file_path>
+    python voice_player.py <file> <file> ...   # Play several files back to back
     python voice_player.py --latest     # Play latest voice file
     python voice_player.py --list       # List all voice files
     python voice_player.py --dir        # Show voice directory
@@ -16,7 +17,9 @@ Author: lutra 🦦
 import os
 import sys
 import glob
+import shutil
 import argparse
+import functools
 import subprocess
 from pathlib import Path
 from datetime import datetime
@@ -25,52 +28,30 @@ from datetime import datetime
 VOICE_DIR = Path("/home/zous/.clawdbot/media/inbound")
 SUPPORTED_FORMATS = ('.ogg', '.mp3', '.wav', '.m4a', '.aac')
 
-
-def check_audio_player():
-    """Check available audio players."""
-    players = []
-
-    # Check for common audio players
-    for player in ['paplay', 'aplay', 'ffplay', 'mplayer', 'cvlc']:
-        try:
-            subprocess.run(['which', player], capture_output=True, check=True)
-            players.append(player)
-        except subprocess.CalledProcessError:
-            continue
-
-    return players
+# Playback commands in order of preference; the file path is appended.
+# ffplay: -nodisp = no display window, -autoexit = exit when playback finishes
+PLAYER_COMMANDS = {
+    'ffplay': ['ffplay', '-nodisp', '-autoexit'],   # FFmpeg
+    'paplay': ['paplay'],                            # PulseAudio
+    'aplay': ['aplay'],                              # ALSA
+}
 
 
-def play_with_ffplay(file_path):
-    """Play using ffplay (FFmpeg)."""
-    try:
-        # -nodisp: no display window
-        # -autoexit: exit when playback finishes
-        subprocess.run(['ffplay', '-nodisp', '-autoexit', str(file_path)],
-                      check=True)
-        return True
-    except Exception as e:
-        print(f"ffplay failed: {e}")
-        return False
-
-
-def play_with_paplay(file_path):
-    """Play using paplay (PulseAudio)."""
-    try:
-        subprocess.run(['paplay', str(file_path)], check=True)
-        return True
-    except Exception as e:
-        print(f"paplay failed: {e}")
-        return False
+@functools.lru_cache(maxsize=1)
+def check_audio_player():
+    """Check available audio players (looked up once per process)."""
+    # Check for common audio players on PATH without spawning `which`
+    return [player for player in ['paplay', 'aplay', 'ffplay', 'mplayer', 'cvlc']
+            if shutil.which(player)]
 
 
-def play_with_aplay(file_path):
-    """Play using aplay (ALSA)."""
+def play_with(player, file_path):
+    """Play using one of PLAYER_COMMANDS."""
     try:
-        subprocess.run(['aplay', str(file_path)], check=True)
+        subprocess.run(PLAYER_COMMANDS[player] + [str(file_path)], check=True)
         return True
     except Exception as e:
-        print(f"aplay failed: {e}")
+        print(f"{player} failed: {e}")
         return False
 
 
@@ -95,42 +76,84 @@ def play_voice(file_path):
     print(f"   Available players: {', '.join(players)}")
 
     # Try each player
-    for player in ['ffplay', 'paplay', 'aplay']:
+    for player in PLAYER_COMMANDS:
         if player in players:
             print(f"   Trying {player}...")
-            if player == 'ffplay':
-                if play_with_ffplay(file_path):
-                    print("✅ Playback complete!")
-                    return True
-            elif player == 'paplay':
-                if play_with_paplay(file_path):
-                    print("✅ Playback complete!")
-                    return True
-            elif player == 'aplay':
-                if play_with_aplay(file_path):
-                    print("✅ Playback complete!")
-                    return True
+            if play_with(player, file_path):
+                print("✅ Playback complete!")
+                return True
 
     print("❌ Playback failed with all available players")
     return False
 
 
+def scan_voice_files():
+    """Voice files in VOICE_DIR as DirEntry objects, from a single directory pass."""
+    # DirEntry caches its stat() result, so sorting and printing reuse one stat per file
+    with os.scandir(VOICE_DIR) as it:
+        return [e for e in it
+                if e.name.lower().endswith(SUPPORTED_FORMATS) and e.is_file()]
+
+
+def start_playback(file_path):
+    """Start playing a file in the background with the preferred player.
+
+    Returns the Popen handle, or None if no player could be started.
+    """
+    players = check_audio_player()
+    for player in PLAYER_COMMANDS:
+        if player in players:
+            try:
+                return subprocess.Popen(PLAYER_COMMANDS[player] + [str(file_path)],
+                                        stdin=subprocess.DEVNULL)
+            except OSError as e:
+                print(f"{player} failed: {e}")
+    return None
+
+
+def play_all(file_paths):
+    """Play files back to back.
+
+    Playback runs in the background, so the next file is checked while the
+    current one plays; each file still starts only after the previous ends.
+    """
+    played = 0
+    current = None
+
+    for file_path in map(Path, file_paths):
+        if not file_path.exists():
+            print(f"❌ File not found: {file_path}")
+            continue
+
+        if current is not None:
+            played += current.wait() == 0
+        print(f"🔊 Playing: {file_path.name} ...")
+        current = start_playback(file_path)
+        if current is None:
+            print("❌ No audio player found! (run --install)")
+            return False
+
+    if current is not None:
+        played += current.wait() == 0
+
+    print(f"✅ Played {played}/{len(file_paths)} files")
+    return played == len(file_paths)
+
+
 def get_latest_voice():
     """Get the most recent voice file."""
     if not VOICE_DIR.exists():
         print(f"❌ Voice directory not found: {VOICE_DIR}")
         return None
 
-    voice_files = []
-    for ext in SUPPORTED_FORMATS:
-        voice_files.extend(VOICE_DIR.glob(f"*{ext}"))
+    voice_files = scan_voice_files()
 
     if not voice_files:
         print("📭 No voice files found")
         return None
 
-    latest = max(voice_files, key=lambda f: f.stat().st_mtime)
-    return latest
+    latest = max(voice_files, key=lambda e: e.stat().st_mtime)
+    return Path(latest.path)
 
 
 def list_voice_files():
@@ -139,19 +162,17 @@ def list_voice_files():
         print(f"❌ Voice directory not found: {VOICE_DIR}")
         return []
 
-    voice_files = []
-    for ext in SUPPORTED_FORMATS:
-        voice_files.extend(VOICE_DIR.glob(f"*{ext}"))
-
-    voice_files.sort(key=lambda f: f.stat().st_mtime, reverse=True)
+    voice_files = scan_voice_files()
+    voice_files.sort(key=lambda e: e.stat().st_mtime, reverse=True)
 
     print(f"\n📁 Voice Files in {VOICE_DIR}:\n")
-    for i, f in enumerate(voice_files, 1):
-        mtime = datetime.fromtimestamp(f.stat().st_mtime).strftime("%Y-%m-%d %H:%M:%S")
-        size_kb = f.stat().st_size / 1024
-        print(f"  {i:2}. [{mtime}] {f.name} ({size_kb:.1f} KB)")
+    for i, e in enumerate(voice_files, 1):
+        st = e.stat()
+        mtime = datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d %H:%M:%S")
+        size_kb = st.st_size / 1024
+        print(f"  {i:2}. [{mtime}] {e.name} ({size_kb:.1f} KB)")
 
-    return voice_files
+    return [Path(e.path) for e in voice_files]
 
 
 def install_deps():
@@ -174,6 +195,7 @@ def install_deps():
 
     print("✅ Dependencies installed!")
     print("\nNow check audio players:")
+    check_audio_player.cache_clear()  # freshly installed players are on PATH now
     players = check_audio_player()
     print(f"   Available: {players or 'None'}")
 
@@ -185,6 +207,7 @@ def main():
         epilog="""
 Examples:
   python voice_player.py message.ogg              # Play specific file
+  python voice_player.py a.ogg b.ogg              # Play files in sequence
   python voice_player.py --latest                 # Play latest voice
   python voice_player.py --list                   # List all voices
   python voice_player.py --dir                    # Show directory path
@@ -192,7 +215,7 @@ Examples:
         """
     )
 
-    parser.add_argument('file', nargs='?', help='Voice file to play')
+    parser.add_argument('file', nargs='*', help='Voice file(s) to play')
     parser.add_argument('--latest', '-l', action='store_true',
                         help='Play the most recent voice file')
     parser.add_argument('--list', '-ls', action='store_true',
@@ -212,7 +235,7 @@ Examples:
         print(f"📁 Voice directory: {VOICE_DIR}")
         print(f"   Exists: {VOICE_DIR.exists()}")
         if VOICE_DIR.exists():
-            count = len([f for ext in SUPPORTED_FORMATS for f in VOICE_DIR.glob(f"*{ext}")])
+            count = len(scan_voice_files())
             print(f"   Files: {count}")
         players = check_audio_player()
         if players:
@@ -232,8 +255,12 @@ Examples:
         play_voice(file_path)
         return
 
+    if len(args.file) == 1:
+        play_voice(args.file[0])
+        return
+
     if args.file:
-        play_voice(args.file)
+        play_all(args.file)
         return
 
     # No arguments: show help